@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the predictions of the advisor against the actual durations of
+the mappers on the light and heavy tasks of the main benchmark
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import time
+
+from taskcarrier import (SerialMapper, StaticParallelMapper,
+                         DynamicParallelMapper, advise)
+
+
+def light_task(x):
+    time.sleep(0.0001)
+    return x+1
+
+def heavy_task(x):
+    time.sleep(0.01)
+    return x+1
+
+
+
+if __name__ == '__main__':
+    cpu = 2
+    nb_run = 3
+    size_range = [0, 100, 500, 1000, 2000]
+    mappers = [("serial", SerialMapper()),
+               ("static", StaticParallelMapper(cpu)),
+               ("dynamic", DynamicParallelMapper(cpu))]
+
+    for task in (light_task, heavy_task):
+        advice = advise(task, range(20), n_jobs=cpu)
+        print "Advice for", task.__name__
+        print advice
+        for size in size_range:
+            data = range(size)
+            predicted = advice.predict(size)
+            for name, mapper in mappers:
+                t = 0
+                for i in xrange(nb_run):
+                    start = time.time()
+                    mapper(task, data)
+                    t += time.time() - start
+                print "Size", str(size), name, "predicted", \
+                    str(predicted[name]), "time", str(t/nb_run)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the per-call cost of an expensive setup (loading a model)
+done in every call, once per chunk or once per worker with an initializer
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import time
+
+from taskcarrier import (StaticParallelMapper, DynamicParallelMapper,
+                         get_worker_state)
+
+
+def load_model():
+    # Stands for reading the weights of a model from the disk
+    time.sleep(0.02)
+    return dict((i, i % 7) for i in xrange(100000))
+
+def predict(model, x):
+    return model[x % len(model)]
+
+def predict_loading(x):
+    return predict(load_model(), x)
+
+def predict_chunk(xs):
+    model = load_model()
+    return [predict(model, x) for x in xs]
+
+def predict_initialized(x):
+    return predict(get_worker_state(), x)
+
+
+
+if __name__ == '__main__':
+    cpu = 2
+    nb_run = 3
+    size = 400
+    data = range(size)
+    chunks = [data[i:i+size/(4*cpu)] for i in xrange(0, size, size/(4*cpu))]
+
+    experiences = [
+        ("load per call", DynamicParallelMapper(cpu), predict_loading, data),
+        ("load per chunk", DynamicParallelMapper(cpu), predict_chunk, chunks),
+        ("initializer (dynamic)",
+         DynamicParallelMapper(cpu, initializer=load_model),
+         predict_initialized, data),
+        ("initializer (static)",
+         StaticParallelMapper(cpu, chunks_per_worker=4,
+                              initializer=load_model),
+         predict_initialized, data),
+    ]
+    for name, mapper, function, inputs in experiences:
+        t = 0
+        for i in xrange(nb_run):
+            mapper(function, inputs)
+            t += mapper.stats.elapsed
+        t /= nb_run
+        print name, "time", str(t), "per call", str(t / size)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the makespans predicted by the simulator against the actual
+durations of the mappers on the uniform and biased workloads
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import time
+import random
+
+from taskcarrier import (StaticParallelMapper, DynamicParallelMapper, advise,
+                         simulate)
+
+
+def nap(duration):
+    time.sleep(duration)
+    return duration
+
+
+
+if __name__ == '__main__':
+    cpu = 2
+    size = 500
+    workloads = [
+        ("uniform", [random.uniform(0, 0.002) for _ in xrange(size)]),
+        ("biased", [max(0, random.gauss(x/100000., 0.001))
+                    for x in xrange(size)]),
+    ]
+    advice = advise(nap, [0.], n_jobs=cpu)
+    print "Dispatch", str(advice.dispatch_time), "startup", \
+        str(advice.startup_time)
+
+    for name, durations in workloads:
+        configs = [("static", StaticParallelMapper(cpu), {}),
+                   ("static", StaticParallelMapper(cpu, chunks_per_worker=8),
+                    {"chunks_per_worker": 8}),
+                   ("dynamic", DynamicParallelMapper(cpu), {})]
+        for policy, mapper, options in configs:
+            simulation = simulate(durations, policy, cpu,
+                                  advice.dispatch_time, advice.startup_time,
+                                  **options)
+            mapper(nap, durations)
+            print name, simulation, "time", str(mapper.stats.elapsed)
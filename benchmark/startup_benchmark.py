@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the import time of the package and of the latency of the first
+item processed by the workers, with and without preloading
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import sys
+import time
+import subprocess
+
+from taskcarrier import DynamicParallelMapper
+
+
+# Modules which are rather slow to import
+HEAVY_MODULES = ["decimal", "json", "xml.dom.minidom", "email.mime.multipart",
+                 "logging.handlers", "urllib2", "unittest", "cookielib"]
+
+IMPORT_SNIPPET = """
+import time
+t = time.time()
+import taskcarrier
+print time.time() - t
+"""
+
+LATENCY_SNIPPET = """
+import sys
+import time
+sys.path.insert(0, %(path)r)
+from startup_benchmark import first_item_latency
+print first_item_latency(%(n_jobs)d, %(preload)r)
+"""
+
+
+def heavy_task(x):
+    for name in HEAVY_MODULES:
+        __import__(name)
+    return time.time()
+
+
+def first_item_latency(n_jobs, preload):
+    """Return the delay between the start of the map and the first result"""
+    mapper = DynamicParallelMapper(n_jobs, preload=HEAVY_MODULES if preload
+                                   else None)
+    if preload:
+        mapper.warm_up()
+    start = time.time()
+    return min(mapper(heavy_task, range(n_jobs))) - start
+
+
+def run_fresh(snippet):
+    """Run the snippet in a fresh interpreter and return its float output"""
+    out = subprocess.check_output([sys.executable, "-c", snippet])
+    return float(out.strip())
+
+
+
+if __name__ == '__main__':
+    import os
+    nb_run = 10
+    n_jobs = 2
+    path = os.path.dirname(os.path.abspath(__file__))
+
+    t = sum(run_fresh(IMPORT_SNIPPET) for _ in xrange(nb_run)) / nb_run
+    print "Import time of taskcarrier", str(t)
+
+    for preload in (False, True):
+        snippet = LATENCY_SNIPPET % {"path": path, "n_jobs": n_jobs,
+                                     "preload": preload}
+        t = sum(run_fresh(snippet) for _ in xrange(nb_run)) / nb_run
+        print "First item latency", "(preload)" if preload else "(cold)", str(t)
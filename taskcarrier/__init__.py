@@ -15,12 +15,38 @@ __date__ = "26 Mar. 2015"
 
 
 from .taskcarrier import (BoundedIterable, bound_iterable, Partition, Mapper,
-                          SerialMapper, StaticParallelMapper,
-                          DynamicParallelMapper, MapperInstance)
+                          SerialMapper, RunStats, ParallelMapper,
+                          StaticParallelMapper, DynamicParallelMapper,
+                          HybridParallelMapper, MapperInstance)
+from .progress import (ProgressCounter, Progress, ProgressMonitor,
+                       print_progress)
+from .affinity import available_cpus, numa_nodes, placement, set_affinity
+from .retry import MapResult, MapFailure
+from .tuning import AdaptiveParallelMapper, TuningStore
+from .profiling import merge_stats
+from .compression import CODECS
+from .storage import ChunkedResults
+from .sources import FileSource
+from .graph import TaskGraph, TaskFailure
+from .scheduling import FairScheduler, ScheduledMapper
+from .advisor import advise, Advice
+from .memory import available_memory
+from .simulator import simulate, compare, record_durations, Simulation
+from .initialization import get_worker_state
+from .coalescing import CoalescingMapper
 
 
 __all__ = ["BoundedIterable", "bound_iterable", "Partition", "Mapper",
-           "SerialMapper", "StaticParallelMapper", "DynamicParallelMapper",
-           "MapperInstance"]
+           "SerialMapper", "RunStats", "ParallelMapper",
+           "StaticParallelMapper", "DynamicParallelMapper",
+           "HybridParallelMapper", "MapperInstance",
+           "ProgressCounter", "Progress", "ProgressMonitor", "print_progress",
+           "available_cpus", "numa_nodes", "placement", "set_affinity",
+           "MapResult", "MapFailure", "AdaptiveParallelMapper", "TuningStore",
+           "merge_stats", "CODECS", "ChunkedResults", "FileSource",
+           "TaskGraph", "TaskFailure", "FairScheduler", "ScheduledMapper",
+           "advise", "Advice", "available_memory", "simulate", "compare",
+           "record_durations", "Simulation", "get_worker_state",
+           "CoalescingMapper"]
 
 
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Prediction of the cost of the mappers from small serialization and dispatch
+probes
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import math
+import time
+import cPickle as pickle
+from timeit import default_timer
+
+from .taskcarrier import DynamicParallelMapper, _new_pool
+from .affinity import available_cpus
+
+
+def _noop(x):
+    return x
+
+
+def _timed(function, *args):
+    """Return the result of `function(*args)` and the time it took"""
+    start = default_timer()
+    result = function(*args)
+    return result, default_timer() - start
+
+
+def _dumps(obj):
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def _mean(values):
+    return sum(values) / float(len(values))
+
+
+class Advice(object):
+    """
+    ======
+    Advice
+    ======
+    An :class:`Advice` holds the costs measured by :func:`advise` and
+    predicts the duration of a map with the :class:`SerialMapper`, the
+    :class:`StaticParallelMapper` and the :class:`DynamicParallelMapper` on
+    `n_items` items with the following model (p being the number of
+    workers running in parallel, that is at most the number of cores
+    divided by the fraction of the call time spent on the CPU, the times
+    being per item unless stated otherwise):
+
+    - serial : n_items * call
+    - static : startup + p * dispatch + n_items * parent
+      + n_items * (call + worker) / p + imbalance
+    - dynamic : startup + n_items * (dispatch + function + parent)
+      + n_items * (call + worker) / p
+
+    where `parent` is the time the parent spends pickling the arguments and
+    unpickling the result, `worker` the time a worker spends unpickling the
+    arguments and pickling the result, `function` the time to pickle the
+    function and `imbalance` the expected lateness of the slowest worker of
+    the static mapper given the spread of the call times.
+
+    Attributes
+    ----------
+    n_jobs : int
+        The number of workers
+    n_cores : int
+        The number of cores available to the workers
+    cpu_fraction : float
+        The fraction of the call time spent on the CPU (rather than waiting
+        for I/O, for instance)
+    function_size, item_size, result_size : int
+        The pickled size of the function and the mean pickled sizes of the
+        arguments and of the results (in bytes)
+    call_time, call_std : float
+        The mean and the standard deviation of the duration of a call
+    function_time : float
+        The time to pickle and unpickle the function
+    parent_time, worker_time : float
+        The serialization time per item in the parent and in a worker
+    startup_time : float
+        The fixed cost of a parallel map (starting and stopping the pool)
+    dispatch_time : float
+        The overhead of dispatching a task, beyond the serialization
+    """
+
+    def __init__(self, **measures):
+        self.__dict__.update(measures)
+
+    def predict(self, n_items):
+        """
+        Return a dict mapping "serial", "static" and "dynamic" to the
+        predicted duration (in seconds) of a map on `n_items` items
+        """
+        p = max(min(self.n_jobs, self.n_cores / self.cpu_fraction), 1)
+        work = n_items * (self.call_time + self.worker_time) / p
+        imbalance = 0.
+        if p > 1 and n_items > 0:
+            # Expected maximum over p workers of the deviation of the sum of
+            # n_items / p call times
+            imbalance = self.call_std * math.sqrt(2. * n_items / p
+                                                  * math.log(p))
+        static = (self.startup_time + p * self.dispatch_time
+                  + n_items * self.parent_time + work + imbalance)
+        dynamic = (self.startup_time
+                   + n_items * (self.dispatch_time + self.function_time
+                                + self.parent_time)
+                   + work)
+        return {"serial": n_items * self.call_time, "static": static,
+                "dynamic": dynamic}
+
+    def recommend(self, n_items):
+        """Return the name of the fastest mapper on `n_items` items"""
+        predicted = self.predict(n_items)
+        return min(("serial", "static", "dynamic"),
+                   key=lambda name: predicted[name])
+
+    def break_even(self, max_items=10**9):
+        """
+        Return a dict mapping "static" and "dynamic" to the smallest number
+        of items (up to `max_items`) from which the mapper is predicted to
+        be faster than the serial computation (None if it never is)
+        """
+        break_even = {}
+        for name in ("static", "dynamic"):
+            faster = lambda n: (self.predict(n)[name]
+                                < self.predict(n)["serial"])
+            if not faster(max_items):
+                break_even[name] = None
+                continue
+            # Exponential then binary search
+            low, high = 0, 1
+            while high < max_items and not faster(high):
+                low, high = high, min(2 * high, max_items)
+            while high - low > 1:
+                middle = (low + high) // 2
+                if faster(middle):
+                    high = middle
+                else:
+                    low = middle
+            break_even[name] = high
+        return break_even
+
+    def __repr__(self):
+        attrs = ", ".join("%s=%r" % (k, v) for k, v
+                          in sorted(self.__dict__.items()))
+        return "Advice(%s)" % attrs
+
+    def __str__(self):
+        lines = ["call: %.3g s (std %.3g s)" % (self.call_time,
+                                                self.call_std),
+                 "pickled sizes: function %d B, item %d B, result %d B"
+                 % (self.function_size, self.item_size, self.result_size),
+                 "serialization: function %.3g s, parent %.3g s/item, "
+                 "worker %.3g s/item" % (self.function_time, self.parent_time,
+                                         self.worker_time),
+                 "pool (%d workers, %d cores): startup %.3g s, "
+                 "dispatch %.3g s/task" % (self.n_jobs, self.n_cores,
+                                           self.startup_time,
+                                           self.dispatch_time)]
+        for name, n_items in sorted(self.break_even().items()):
+            lines.append("%s mapper break-even: %s items"
+                         % (name, "never" if n_items is None else n_items))
+        return "\n".join(lines)
+
+
+def advise(function, seq1, *seqs, **kwargs):
+    """
+    advise(function, sequence[, sequence, ...], n_jobs=-1, backend=None,
+    n_probes=200) -> :class:`Advice`
+
+    Measure the costs of mapping `function` on this machine from a sample
+    of its inputs (given as for :meth:`Mapper.map`) without running the
+    whole workload: the function is called once per sample item (in the
+    parent) and the pool overhead is measured with `n_probes` no-op tasks
+
+    Parameters
+    ----------
+    function : callable
+        The function to map
+    sequences :
+        A few representative inputs
+    n_jobs : int (-1 or >0) (Default : -1)
+        The number of workers (see :class:`ParallelMapper`)
+    backend : str ("multiprocessing" or "threading") or None (Default : None)
+        The backend to use
+    n_probes : int (>0) (Default : 200)
+        The number of no-op tasks used to measure the dispatch overhead
+    """
+    n_jobs = kwargs.pop("n_jobs", -1)
+    backend = kwargs.pop("backend", None)
+    n_probes = kwargs.pop("n_probes", 200)
+    if len(kwargs) > 0:
+        raise TypeError("Unexpected keyword arguments: %s"
+                        % ", ".join(sorted(kwargs)))
+    samples = zip(seq1, *seqs)
+    if len(samples) == 0:
+        raise ValueError("At least one sample is needed")
+
+    data, dumps_time = _timed(_dumps, function)
+    _, loads_time = _timed(pickle.loads, data)
+    function_size = len(data)
+    function_time = dumps_time + loads_time
+
+    call_times, item_sizes, result_sizes = [], [], []
+    parent_times, worker_times = [], []
+    cpu_time = 0.
+    for args in samples:
+        data, item_dumps = _timed(_dumps, args)
+        _, item_loads = _timed(pickle.loads, data)
+        item_sizes.append(len(data))
+        start = time.clock()
+        result, call_time = _timed(function, *args)
+        cpu_time += time.clock() - start
+        call_times.append(call_time)
+        data, result_dumps = _timed(_dumps, result)
+        _, result_loads = _timed(pickle.loads, data)
+        result_sizes.append(len(data))
+        parent_times.append(item_dumps + result_loads)
+        worker_times.append(item_loads + result_dumps)
+    call_time = _mean(call_times)
+    call_std = math.sqrt(_mean([(t - call_time) ** 2 for t in call_times]))
+    cpu_fraction = 1.
+    if call_time > 0:
+        cpu_fraction = min(max(cpu_time / sum(call_times), 0.01), 1.)
+
+    mapper = DynamicParallelMapper(n_jobs, backend=backend)
+    n_jobs = mapper.n_jobs
+    mapper.warm_up()
+    # The fixed cost of a map: starting and stopping the pool and running a
+    # task per worker. Stopping the pool waits up to 0.1s for its threads:
+    # the median of a few runs is less noisy
+    startups = sorted(_timed(mapper.map, _noop, range(n_jobs))[1]
+                      for _ in xrange(3))
+    startup_time = startups[1]
+    dispatch_time = 0.
+    pool = _new_pool(n_jobs, backend)
+    if pool is not None:
+        try:
+            pool.map(_noop, range(n_jobs), chunksize=1)
+            start = default_timer()
+            outcomes = [pool.apply_async(_noop, (i,))
+                        for i in xrange(n_probes)]
+            for outcome in outcomes:
+                outcome.get()
+            dispatch_time = (default_timer() - start) / n_probes
+        finally:
+            pool.terminate()
+
+    return Advice(n_jobs=n_jobs, n_cores=len(available_cpus()),
+                  cpu_fraction=cpu_fraction,
+                  function_size=function_size,
+                  item_size=_mean(item_sizes),
+                  result_size=_mean(result_sizes), call_time=call_time,
+                  call_std=call_std, function_time=function_time,
+                  parent_time=_mean(parent_times),
+                  worker_time=_mean(worker_times), startup_time=startup_time,
+                  dispatch_time=dispatch_time)
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+CPU affinity and NUMA-aware placement of the workers (Linux only)
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import re
+import glob
+import threading
+
+from .shared import InheritedState
+
+
+POLICIES = ("compact", "scatter", "numa")
+
+_NODE_DIR = "/sys/devices/system/node"
+
+
+def parse_cpulist(cpulist):
+    """
+    Parse a Linux cpu list (e.g. "0-3,8,10-11")
+
+    Example
+    -------
+    >>> parse_cpulist("0-3,8,10-11")
+    [0, 1, 2, 3, 8, 10, 11]
+    """
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def available_cpus():
+    """Return the sorted list of the cpus this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    try:
+        with open("/proc/self/status") as hdl:
+            for line in hdl:
+                if line.startswith("Cpus_allowed_list:"):
+                    return parse_cpulist(line.split(":", 1)[1])
+    except IOError:
+        pass
+    import multiprocessing
+    return range(multiprocessing.cpu_count())
+
+
+def numa_nodes(node_dir=_NODE_DIR):
+    """
+    Return the list of the NUMA nodes as lists of available cpus. If the
+    topology cannot be read, all the available cpus form a single node
+    """
+    cpus = set(available_cpus())
+    nodes = []
+    paths = glob.glob(os.path.join(node_dir, "node*", "cpulist"))
+    key = lambda path: int(re.search(r"node(\d+)", path).group(1))
+    for path in sorted(paths, key=key):
+        with open(path) as hdl:
+            node = [cpu for cpu in parse_cpulist(hdl.read()) if cpu in cpus]
+        if len(node) > 0:
+            nodes.append(node)
+    if len(nodes) == 0:
+        nodes = [sorted(cpus)]
+    return nodes
+
+
+def placement(policy, n_workers, nodes=None):
+    """
+    Return the core set of each worker according to the placement policy
+
+    Parameters
+    ----------
+    policy : str in :data:`POLICIES`
+        - "compact" : one core per worker, filling each NUMA node in turn
+        - "scatter" : one core per worker, spreading the workers
+          round-robin over the NUMA nodes
+        - "numa" : each worker is bound to all the cores of a NUMA node,
+          the workers being spread round-robin over the nodes
+    n_workers : int (>0)
+        The number of workers
+    nodes : list of list of int or None (Default : None)
+        The NUMA nodes (see :func:`numa_nodes`). If None, the topology of
+        this machine is used
+
+    Return
+    ------
+    core_sets : list of tuples of int
+        The core set of each worker
+
+    Example
+    -------
+    >>> placement("compact", 3, [[0, 1], [2, 3]])
+    [(0,), (1,), (2,)]
+    >>> placement("scatter", 3, [[0, 1], [2, 3]])
+    [(0,), (2,), (1,)]
+    >>> placement("numa", 3, [[0, 1], [2, 3]])
+    [(0, 1), (2, 3), (0, 1)]
+    """
+    if policy not in POLICIES:
+        raise ValueError("Unknown placement policy: %s, expected one of %r"
+                         % (policy, POLICIES))
+    if nodes is None:
+        nodes = numa_nodes()
+    if policy == "numa":
+        return [tuple(nodes[i % len(nodes)]) for i in range(n_workers)]
+    if policy == "compact":
+        cores = [cpu for node in nodes for cpu in node]
+    else:
+        # Interleave the nodes
+        depth = max(len(node) for node in nodes)
+        cores = [node[j] for j in range(depth) for node in nodes
+                 if j < len(node)]
+    return [(cores[i % len(cores)],) for i in range(n_workers)]
+
+
+def _libc_setaffinity(cpus):
+    import ctypes
+    import ctypes.util
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    n_bits = max(1024, max(cpus) + 1)
+    mask = (ctypes.c_ulong * ((n_bits + 63) // 64))()
+    for cpu in cpus:
+        mask[cpu // 64] |= 1 << (cpu % 64)
+    if libc.sched_setaffinity(0, ctypes.sizeof(mask), ctypes.byref(mask)):
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+def set_affinity(cpus):
+    """
+    Bind the calling thread (which is the whole process for a
+    single-threaded worker) to the given cpus
+    """
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    else:
+        _libc_setaffinity(cpus)
+
+
+
+# The plans the current thread is bound by
+_LOCAL = threading.local()
+# The index of the core set of each process, by (plan key, pid), for the
+# plans binding whole processes
+_PROCESS_INDICES = {}
+_LOCK = threading.Lock()
+
+
+class AffinityPlan(InheritedState):
+    """
+    ============
+    AffinityPlan
+    ============
+    An :class:`AffinityPlan` binds each worker to a core set. The first time
+    a worker calls :meth:`pin`, it is attributed the next core set of the
+    plan and records its pid so that the placement can be reported.
+
+    The main thread of the process creating the plan is never pinned (it is
+    used as worker when the computation falls back to sequential mode).
+
+    Constructor parameters
+    ----------------------
+    core_sets : list of tuples of int
+        The core set of each worker (see :func:`placement`)
+    per_process : bool (Default : False)
+        If True, the workers are processes running several threads: all the
+        threads of a process are bound to the core set of the process. The
+        process creating the plan is then never pinned. Otherwise, each
+        thread is a worker on its own
+    """
+
+    def __init__(self, core_sets, per_process=False):
+        from multiprocessing import RawArray, RawValue, Lock
+        self.core_sets = core_sets
+        self.per_process = per_process
+        self._parent = os.getpid()
+        self._share((RawValue('l', 0), RawArray('l', len(core_sets)),
+                     Lock()))
+
+    def _claim(self):
+        """Return the index of the next core set"""
+        next_index, _, lock = self._state
+        with lock:
+            index = next_index.value
+            next_index.value += 1
+        return index
+
+    def pin(self):
+        """Bind the calling worker to its core set (once)"""
+        pinned = getattr(_LOCAL, "pinned", None)
+        if pinned is None:
+            pinned = _LOCAL.pinned = set()
+        if self._key in pinned:
+            return
+        pinned.add(self._key)
+        if self._state is None:
+            return
+        if os.getpid() == self._parent and (
+                self.per_process or
+                isinstance(threading.current_thread(), threading._MainThread)):
+            return
+        _, pids, _ = self._state
+        if self.per_process:
+            # The first thread of the process claims its core set
+            with _LOCK:
+                index = _PROCESS_INDICES.get((self._key, os.getpid()))
+                if index is None:
+                    index = self._claim()
+                    _PROCESS_INDICES[(self._key, os.getpid())] = index
+                    if index < len(self.core_sets):
+                        pids[index] = os.getpid()
+        else:
+            index = self._claim()
+            if index < len(self.core_sets):
+                pids[index] = os.getpid()
+        if index >= len(self.core_sets):
+            # More workers than planned: leave it unbound
+            return
+        try:
+            set_affinity(self.core_sets[index])
+        except OSError:
+            pids[index] = -os.getpid()
+
+    def report(self):
+        """
+        Return the placement as a list of (pid, core set) pairs, one for
+        each worker which was pinned
+        """
+        if self._state is None:
+            return []
+        next_index, pids, _ = self._state
+        n_pinned = min(next_index.value, len(self.core_sets))
+        return [(pids[i], self.core_sets[i]) for i in range(n_pinned)
+                if pids[i] > 0]
+
+
+class _Pinned(object):
+    """A callable pinning the worker to its core set before delegating"""
+
+    def __init__(self, plan, function):
+        self.plan = plan
+        self.function = function
+
+    def __call__(self, *args):
+        self.plan.pin()
+        return self.function(*args)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescing of concurrent small maps into batches
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import threading
+
+from .taskcarrier import Mapper, DynamicParallelMapper
+
+
+class _Batch(object):
+    """The items of the calls coalesced into one map"""
+
+    def __init__(self, function):
+        self.function = function
+        self.items = []
+        # The (start, stop) range of the items of each call
+        self.calls = []
+        # The (results, error) pair of each call
+        self.outcomes = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+    def add(self, items):
+        """Add the items of a call and return the index of the call"""
+        self.calls.append((len(self.items), len(self.items) + len(items)))
+        self.items.extend(items)
+        return len(self.calls) - 1
+
+
+class CoalescingMapper(Mapper):
+    """
+    ================
+    CoalescingMapper
+    ================
+    A :class:`CoalescingMapper` is a front end for a :class:`Mapper` shared
+    by many threads making small maps. The concurrent calls for the same
+    function are collected during a short window and sent to the underlying
+    mapper as a single map, so that they share the dispatching overhead.
+    The results are then split back to each caller.
+
+    The first call of a batch waits for the window to elapse (or for the
+    batch to be full) and runs the batch. The underlying mapper runs one
+    batch at a time; the calls made in the meantime keep joining the next
+    batch. A call therefore waits at most the window plus the time to run
+    the batch in progress before its own batch starts.
+
+    If a batch fails, its calls are run again one by one, so that an error
+    only reaches the caller whose items raised it.
+
+    Constructor parameters
+    ----------------------
+    mapper : :class:`Mapper` or None (Default : None)
+        The underlying mapper. If None, a default
+        :class:`DynamicParallelMapper`
+    window : float (>=0) (Default : 0.005)
+        The time (in seconds) during which the calls are collected
+    max_items : int (>0) or None (Default : None)
+        If not None, a batch is run as soon as it holds that many items
+
+    Attributes
+    ----------
+    n_calls : int
+        The number of calls to :meth:`map` so far
+    n_batches : int
+        The number of maps of the underlying mapper so far
+
+    Intended usage
+    --------------
+    >>> from taskcarrier import SerialMapper
+    >>> mapper = CoalescingMapper(SerialMapper(), window=0.001)
+    >>> mapper.map(abs, [-1, -2, 3])
+    [1, 2, 3]
+    """
+
+    def __init__(self, mapper=None, window=0.005, max_items=None):
+        if mapper is None:
+            mapper = DynamicParallelMapper()
+        self.mapper = mapper
+        self.window = window
+        self.max_items = max_items
+        self.n_calls = 0
+        self.n_batches = 0
+        self._lock = threading.Lock()
+        # The batch collecting the calls of each function
+        self._open = {}
+        # The underlying mapper runs one batch at a time
+        self._run_lock = threading.Lock()
+
+    def _close(self, batch):
+        """Stop collecting calls into the batch (holding the lock)"""
+        if self._open.get(batch.function) is batch:
+            del self._open[batch.function]
+        batch.full.set()
+
+    def _map(self, function, items):
+        self.n_batches += 1
+        if len(items) == 0:
+            return []
+        return list(self.mapper.map(function, *[list(column) for column
+                                                in zip(*items)]))
+
+    def _run(self, batch):
+        with self._run_lock:
+            with self._lock:
+                self._close(batch)
+            try:
+                results = self._map(batch.function, batch.items)
+                batch.outcomes = [(results[start:stop], None)
+                                  for start, stop in batch.calls]
+            except Exception as error:
+                if len(batch.calls) == 1:
+                    batch.outcomes = [(None, error)]
+                else:
+                    batch.outcomes = []
+                    for start, stop in batch.calls:
+                        try:
+                            batch.outcomes.append((self._map(
+                                batch.function, batch.items[start:stop]),
+                                None))
+                        except Exception as error:
+                            batch.outcomes.append((None, error))
+            finally:
+                if batch.outcomes is None:
+                    batch.outcomes = []
+                # E.g. interrupted
+                missing = len(batch.calls) - len(batch.outcomes)
+                batch.outcomes.extend([(None, RuntimeError(
+                    "The batch did not complete"))] * missing)
+                batch.done.set()
+
+    def map(self, function, seq1, *seqs):
+        items = zip(seq1, *seqs)
+        with self._lock:
+            self.n_calls += 1
+            batch = self._open.get(function)
+            leader = batch is None
+            if leader:
+                batch = self._open[function] = _Batch(function)
+            index = batch.add(items)
+            if (self.max_items is not None
+                    and len(batch.items) >= self.max_items):
+                self._close(batch)
+        if leader:
+            batch.full.wait(self.window)
+            self._run(batch)
+        else:
+            # Waiting without a timeout cannot be interrupted in Python 2
+            while not batch.done.wait(1.):
+                pass
+        results, error = batch.outcomes[index]
+        if error is not None:
+            raise error
+        return results
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Compressed transport of the payloads between the parent and the workers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import bz2
+import zlib
+import time
+import threading
+import cPickle as pickle
+
+
+CODECS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+}
+try:
+    # Python 3 or the backports.lzma package
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+if lzma is not None:
+    CODECS["lzma"] = (lzma.compress, lzma.decompress)
+
+
+class Packed(object):
+    """
+    ======
+    Packed
+    ======
+    A :class:`Packed` is an object on its way between processes. The
+    `payload` is its pickle, compressed if the pickled size reached the
+    threshold. Shipping the pickle already made to measure the size saves
+    the pool from pickling the object a second time.
+
+    Attributes
+    ----------
+    payload : str
+        The pickle of the object, compressed or not
+    codec : str or None
+        The codec of the payload (None if not compressed)
+    raw_size : int
+        The size of the pickled object (in bytes)
+    elapsed : float
+        The time spent (un)pickling and (de)compressing in the worker
+    """
+
+    def __init__(self, payload, codec, raw_size, elapsed=0.):
+        self.payload = payload
+        self.codec = codec
+        self.raw_size = raw_size
+        self.elapsed = elapsed
+
+    @property
+    def size(self):
+        """The transported size (in bytes)"""
+        return len(self.payload)
+
+
+class Compressor(object):
+    """
+    ==========
+    Compressor
+    ==========
+    A :class:`Compressor` packs and unpacks objects, keeping track of the
+    raw and compressed sizes of what goes through it and of the time spent
+    compressing (including the time reported by the :class:`Packed`
+    objects). It is thread safe.
+
+    Constructor parameters
+    ----------------------
+    codec : str (a key of :data:`CODECS`) (Default : "zlib")
+        The compression codec
+    threshold : int (>=0) (Default : 65536)
+        Objects whose pickle is smaller (in bytes) are not compressed
+    """
+
+    def __init__(self, codec="zlib", threshold=65536):
+        if codec not in CODECS:
+            raise ValueError("Unknown codec: %s, expected one of %r"
+                             % (codec, sorted(CODECS)))
+        self.codec = codec
+        self.threshold = threshold
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.elapsed = 0.
+        self._lock = threading.Lock()
+
+    def _account(self, packed, elapsed):
+        with self._lock:
+            self.raw_bytes += packed.raw_size
+            self.compressed_bytes += packed.size
+            self.elapsed += elapsed + packed.elapsed
+
+    def pack(self, obj):
+        """Return `obj` as a :class:`Packed`"""
+        start = time.time()
+        data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        if len(data) < self.threshold:
+            packed = Packed(data, None, len(data))
+        else:
+            compress = CODECS[self.codec][0]
+            packed = Packed(compress(data), self.codec, len(data))
+        self._account(packed, time.time() - start)
+        return packed
+
+    def unpack(self, packed):
+        """Return the object of a :class:`Packed` (other objects as is)"""
+        if not isinstance(packed, Packed):
+            return packed
+        start = time.time()
+        data = packed.payload
+        if packed.codec is not None:
+            data = CODECS[packed.codec][1](data)
+        obj = pickle.loads(data)
+        self._account(packed, time.time() - start)
+        return obj
+
+
+class Compressing(object):
+    """
+    ===========
+    Compressing
+    ===========
+    A :class:`Compressing` callable unpacks the :class:`Packed` arguments of
+    the given task before running it and packs its output, which also
+    reports the time the worker spent on compression.
+
+    Constructor parameters
+    ----------------------
+    task : callable
+        The task to run
+    codec : str (a key of :data:`CODECS`)
+        The compression codec
+    threshold : int (>=0)
+        Objects whose pickle is smaller (in bytes) are not compressed
+    """
+
+    def __init__(self, task, codec, threshold):
+        self.task = task
+        self.codec = codec
+        self.threshold = threshold
+
+    def __call__(self, *args):
+        compressor = Compressor(self.codec, self.threshold)
+        args = [compressor.unpack(arg) for arg in args]
+        output = compressor.pack(self.task(*args))
+        output.elapsed = compressor.elapsed
+        return output
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Scheduling of a graph of dependent tasks on a pool of workers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import time
+import traceback
+from collections import OrderedDict
+from Queue import Queue, Empty
+
+from .retry import TaskTracker, WORKER_CRASHED
+
+
+class TaskFailure(Exception):
+    """
+    Raised when a task of a :class:`TaskGraph` fails. The results of the
+    tasks completed so far are available as the `results` attribute
+    """
+
+    def __init__(self, name, error, results):
+        super(TaskFailure, self).__init__("Task %r failed:\n%s"
+                                          % (name, error))
+        self.name = name
+        self.results = results
+
+
+def run_chain(steps, inputs):
+    """
+    Run a chain of tasks: the first one is given the `inputs` (the results
+    of its dependencies), each other one the result of its predecessor.
+    Return the pair (index of the failed step or None, result or formatted
+    traceback)
+    """
+    for i, (function, args) in enumerate(steps):
+        try:
+            inputs = (function(*(tuple(inputs) + tuple(args))),)
+        except Exception:
+            return i, traceback.format_exc()
+    return None, inputs[0]
+
+
+def run_tracked_chain(tracker, task_id, steps, inputs):
+    """Record the worker running the chain in `tracker` and run it"""
+    tracker.started(task_id)
+    return run_chain(steps, inputs)
+
+
+class TaskGraph(object):
+    """
+    =========
+    TaskGraph
+    =========
+    A :class:`TaskGraph` is a directed acyclic graph of tasks. Each task is
+    called with the results of its dependencies (in order) followed by its
+    own extra arguments. When run, a task is submitted to the pool as soon
+    as all its dependencies are done, so that the cores are not left idle at
+    the barrier between two steps of a pipeline.
+
+    A task whose single dependency has no other dependent task is fused
+    with it: both run in a row on the same worker and the intermediate
+    result never goes back to the parent (unless it is requested).
+
+    Intended usage
+    --------------
+    >>> from taskcarrier import SerialMapper
+    >>> graph = TaskGraph()
+    >>> graph.add("data", range, args=(10,))
+    >>> graph.add("sum", sum, ["data"])
+    >>> graph.add("max", max, ["data"])
+    >>> graph.add("merge", lambda s, m: (s, m), ["sum", "max"])
+    >>> graph.run(SerialMapper())
+    {'merge': (45, 9)}
+    """
+
+    def __init__(self):
+        self._tasks = OrderedDict()
+
+    def add(self, name, function, dependencies=(), args=()):
+        """
+        Add a task
+
+        Parameters
+        ----------
+        name : hashable
+            The name of the task
+        function : callable
+            The task itself
+        dependencies : sequence of names (Default : ())
+            The names of the tasks whose results are the first arguments of
+            `function` (they must already be in the graph)
+        args : tuple (Default : ())
+            Extra arguments of `function`
+        """
+        if name in self._tasks:
+            raise ValueError("Duplicate task: %r" % (name,))
+        for dependency in dependencies:
+            if dependency not in self._tasks:
+                raise ValueError("Unknown dependency of %r: %r"
+                                 % (name, dependency))
+        self._tasks[name] = (function, tuple(dependencies), tuple(args))
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def successors(self):
+        """Return a dict mapping each task to the list of its dependents"""
+        successors = dict((name, []) for name in self._tasks)
+        for name, (_, dependencies, _) in self._tasks.items():
+            for dependency in dependencies:
+                successors[dependency].append(name)
+        return successors
+
+    def chains(self, outputs):
+        """
+        Return the chains of fused tasks (lists of task names) in
+        topological order (the tasks are added after their dependencies).
+        Tasks in `outputs` end their chain
+        """
+        successors = self.successors()
+        chains = []
+        chain_of = {}
+        for name, (_, dependencies, _) in self._tasks.items():
+            if len(dependencies) == 1:
+                parent = dependencies[0]
+                if (len(successors[parent]) == 1 and parent not in outputs
+                        and chains[chain_of[parent]][-1] == parent):
+                    chains[chain_of[parent]].append(name)
+                    chain_of[name] = chain_of[parent]
+                    continue
+            chain_of[name] = len(chains)
+            chains.append([name])
+        return chains
+
+    def run(self, mapper=None, outputs=None):
+        """
+        Run the graph
+
+        Parameters
+        ----------
+        mapper : :class:`Mapper` or None (Default : None)
+            The mapper whose pool settings (number of workers, backend and
+            temporary folder) to use. A :class:`SerialMapper` runs the tasks
+            sequentially. If None, a default :class:`DynamicParallelMapper`.
+            With a process backend, the functions and results must be
+            picklable: a task which cannot be sent or whose result cannot be
+            sent back fails, as does a task whose worker dies
+        outputs : sequence of names or None (Default : None)
+            The tasks whose results to return. If None, the tasks no other
+            task depends on
+
+        Return
+        ------
+        results : dict
+            Maps the name of each requested task to its result
+        """
+        from .taskcarrier import (DynamicParallelMapper, _new_pool,
+                                  _Immediate, CRASH_CHECK_INTERVAL)
+        if mapper is None:
+            mapper = DynamicParallelMapper()
+        successors = self.successors()
+        if outputs is None:
+            outputs = [name for name in self._tasks
+                       if len(successors[name]) == 0]
+        outputs = set(outputs)
+        for name in outputs:
+            if name not in self._tasks:
+                raise ValueError("Unknown output: %r" % (name,))
+        chains = self.chains(outputs)
+        # The number of unfinished dependencies of each chain
+        waiting = dict((chain[0], len(self._tasks[chain[0]][1]))
+                       for chain in chains)
+        index_of = dict((chain[0], i) for i, chain in enumerate(chains))
+
+        # The tracker must be created before the pool is forked
+        tracker = TaskTracker(len(chains))
+        pool = None
+        if hasattr(mapper, "n_jobs"):
+            mapper.warm_up()
+            pool = _new_pool(mapper.n_jobs, mapper.backend,
+                             mapper.temp_folder)
+        # The indices of the chains whose outcome is available
+        done = Queue()
+        # The outcome (AsyncResult) of each submitted chain, by index
+        pending = {}
+        results = {}
+
+        def submit(index):
+            chain = chains[index]
+            steps = [(self._tasks[name][0], self._tasks[name][2])
+                     for name in chain]
+            inputs = [results[dependency]
+                      for dependency in self._tasks[chain[0]][1]]
+            if pool is None:
+                pending[index] = _Immediate(run_chain, (steps, inputs))
+                done.put(index)
+            else:
+                callback = lambda _: done.put(index)
+                pending[index] = pool.apply_async(
+                    run_tracked_chain, (tracker, index, steps, inputs),
+                    callback=callback)
+
+        def fail(chain, failed, error):
+            raise TaskFailure(chain[failed], error,
+                              dict((name, results[name])
+                                   for name in outputs if name in results))
+
+        try:
+            for i, chain in enumerate(chains):
+                if waiting[chain[0]] == 0:
+                    submit(i)
+            n_done = 0
+            last_check = time.time()
+            while n_done < len(chains):
+                try:
+                    ready = [done.get(timeout=CRASH_CHECK_INTERVAL)]
+                except Empty:
+                    ready = []
+                lost = set()
+                if time.time() - last_check >= CRASH_CHECK_INTERVAL:
+                    # The callback is not called on the chains failing in the
+                    # pool itself (e.g. pickling errors) nor on those lost
+                    # with their worker
+                    last_check = time.time()
+                    for index, outcome in pending.items():
+                        if outcome.ready():
+                            ready.append(index)
+                        elif tracker.crashed(index):
+                            lost.add(index)
+                            ready.append(index)
+                for index in ready:
+                    if index not in pending:
+                        # Already processed
+                        continue
+                    outcome = pending.pop(index)
+                    chain = chains[index]
+                    if index in lost:
+                        fail(chain, 0, WORKER_CRASHED)
+                    try:
+                        # The callback is called right before the outcome
+                        # gets ready: get() waits for it
+                        failed, result = outcome.get()
+                    except Exception:
+                        fail(chain, 0, traceback.format_exc())
+                    if failed is not None:
+                        fail(chain, failed, result)
+                    n_done += 1
+                    name = chain[-1]
+                    results[name] = result
+                    for successor in successors[name]:
+                        waiting[successor] -= 1
+                        if waiting[successor] == 0:
+                            submit(index_of[successor])
+        finally:
+            if pool is not None:
+                pool.terminate()
+            tracker.close()
+        return dict((name, results[name]) for name in outputs)
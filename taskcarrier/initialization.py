@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+One-time initialization of the workers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import itertools
+import threading
+
+
+# The states built by the initializers, by (token, pid): a forked worker does
+# not reuse the state (e.g. an open file) its parent may hold
+_STATES = {}
+_TOKENS = itertools.count()
+_LOCK = threading.Lock()
+# The key of the task being run by each thread
+_CURRENT = threading.local()
+# The key of the last task started in this process, for the threads a task
+# may start itself
+_LAST = None
+
+
+def new_token():
+    """Return a token identifying an initializer"""
+    return (os.getpid(), next(_TOKENS))
+
+
+def get_worker_state():
+    """
+    Return the state built by the initializer of the mapper running the
+    current task (see the `initializer` parameter of
+    :class:`ParallelMapper`). In a thread started by the task itself, the
+    state of the last task started in the process is returned. Return None
+    if the process has no such state
+    """
+    key = getattr(_CURRENT, "key", None)
+    if key is None:
+        key = _LAST
+        if key is None or key[1] != os.getpid():
+            return None
+    return _STATES.get(key)
+
+
+def release_state(token):
+    """
+    Drop the state built in this process by the initializer `token` (a
+    forked worker releases its own state when it dies)
+    """
+    global _LAST
+    key = (token, os.getpid())
+    with _LOCK:
+        _STATES.pop(key, None)
+    if _LAST == key:
+        _LAST = None
+
+
+class _Initialized(object):
+    """
+    A worker-level task making sure the initializer has run in the worker
+    process (once per process and token) before delegating
+    """
+
+    def __init__(self, task, token, initializer, initargs):
+        self.task = task
+        self.token = token
+        self.initializer = initializer
+        self.initargs = initargs
+
+    def __call__(self, *args):
+        global _LAST
+        key = (self.token, os.getpid())
+        if key not in _STATES:
+            # The threads of a process share its state
+            with _LOCK:
+                if key not in _STATES:
+                    _STATES[key] = self.initializer(*self.initargs)
+        previous = getattr(_CURRENT, "key", None)
+        _CURRENT.key = _LAST = key
+        try:
+            return self.task(*args)
+        finally:
+            _CURRENT.key = previous
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Memory tracking and throttling of the workers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import sys
+import time
+
+from .shared import InheritedState
+
+
+_MEMINFO = "/proc/meminfo"
+_SMAPS_ROLLUP = "/proc/self/smaps_rollup"
+_STATM = "/proc/self/statm"
+
+# The time (in seconds) between two checks of the available memory when a
+# worker is throttled
+THROTTLE_INTERVAL = 0.05
+
+
+def available_memory(meminfo=_MEMINFO):
+    """
+    Return the memory available for new allocations without swapping (in
+    bytes) as reported by the kernel, or None if it cannot be read
+    """
+    fields = {}
+    try:
+        with open(meminfo) as hdl:
+            for line in hdl:
+                name, _, value = line.partition(":")
+                fields[name] = int(value.split()[0]) * 1024
+    except (IOError, ValueError, IndexError):
+        return None
+    if "MemAvailable" in fields:
+        return fields["MemAvailable"]
+    # Kernels older than 3.14
+    try:
+        return fields["MemFree"] + fields["Buffers"] + fields["Cached"]
+    except KeyError:
+        return None
+
+
+def peak_rss():
+    """Return the peak resident set size of this process (in bytes)"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    # Linux reports kilobytes
+    return peak * 1024
+
+
+def private_memory(smaps=_SMAPS_ROLLUP):
+    """
+    Return the private memory of this process (in bytes), that is its
+    resident pages not shared with another process (e.g. the pages a forked
+    worker still shares with its parent), or None if it cannot be read
+    (Linux 4.14+ only)
+    """
+    private = 0
+    try:
+        with open(smaps) as hdl:
+            for line in hdl:
+                if line.startswith("Private_"):
+                    private += int(line.split()[1]) * 1024
+    except (IOError, ValueError, IndexError):
+        return None
+    return private
+
+
+def resident_memory(statm=_STATM):
+    """
+    Return the resident set size of this process (in bytes), or None if it
+    cannot be read
+    """
+    try:
+        with open(statm) as hdl:
+            return int(hdl.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, ValueError, IndexError, OSError):
+        return None
+
+
+# The monitors alive in this process, by key. Forked workers inherit them,
+# so that only the key of a monitor is shipped along with each task
+_MONITORS = {}
+# The slot of each process in each monitor, by (key, pid)
+_SLOTS = {}
+# The resident set size of each process when it started its first task of
+# each monitor, by (key, pid)
+_BASELINES = {}
+
+
+class MemoryMonitor(InheritedState):
+    """
+    =============
+    MemoryMonitor
+    =============
+    A :class:`MemoryMonitor` records the peak resident set size (shared
+    pages included) of each worker after each task, as well as the peak of
+    its own memory: the growth of its peak resident set size since its first
+    task (which catches the memory freed before the end of a task) and, if
+    asked, its private memory after each task (see :func:`private_memory`).
+    Unlike the resident set size, the latter does not count the pages a
+    forked worker shares with its parent but costs a read of /proc.
+
+    If a threshold is given, the monitor also throttles the workers: a
+    worker about to start a task waits while the available memory is below
+    the threshold and another task is running (so that at least one task
+    always makes progress). Otherwise, the workers only take the lock of
+    the monitor once, to get their slot.
+
+    The monitor must be created before the worker pool is started.
+
+    Constructor parameters
+    ----------------------
+    n_slots : int (>0)
+        The maximum number of workers to track
+    min_available : int or None (Default : None)
+        The amount of available memory (in bytes) under which the workers
+        are throttled. If None, they are never
+    private : bool (Default : False)
+        Whether to also read the private memory of the workers after each
+        task
+    meminfo : str (Default : "/proc/meminfo")
+        The file where to read the available memory
+    """
+
+    def __init__(self, n_slots, min_available=None, private=False,
+                 meminfo=_MEMINFO):
+        from multiprocessing import RawArray, RawValue, Lock
+        self.n_slots = max(n_slots, 1)
+        self.min_available = min_available
+        self.private = private
+        self.meminfo = meminfo
+        # (pids, peaks, next slot, running tasks, throttled time, lock,
+        # own peaks)
+        self._share((RawArray('l', self.n_slots), RawArray('l', self.n_slots),
+                     RawValue('l', 0), RawValue('l', 0), RawValue('d', 0.),
+                     Lock(), RawArray('l', self.n_slots)))
+        _MONITORS[self._key] = self
+
+    def __reduce__(self):
+        return _inherited_monitor, (self._key,)
+
+    def _throttle(self):
+        running, throttled = self._state[3], self._state[4]
+        start = time.time()
+        while running.value > 0:
+            available = available_memory(self.meminfo)
+            if available is None or available >= self.min_available:
+                break
+            time.sleep(THROTTLE_INTERVAL)
+        waited = time.time() - start
+        if waited >= THROTTLE_INTERVAL:
+            with self._state[5]:
+                throttled.value += waited
+
+    def enter(self):
+        """Called by a worker before starting a task"""
+        if self._state is None:
+            return
+        if (self._key, os.getpid()) not in _BASELINES:
+            baseline = resident_memory()
+            if baseline is None:
+                baseline = peak_rss()
+            _BASELINES[(self._key, os.getpid())] = baseline
+        if self.min_available is not None:
+            self._throttle()
+            with self._state[5]:
+                self._state[3].value += 1
+
+    def exit(self):
+        """Called by a worker after a task"""
+        if self._state is None:
+            return
+        pids, peaks, next_slot, running, _, lock, own_peaks = self._state
+        key = (self._key, os.getpid())
+        if self.min_available is not None:
+            with lock:
+                running.value -= 1
+        # Forked workers inherit the slots of the parent
+        slot = _SLOTS.get(key)
+        if slot is None:
+            with lock:
+                slot = _SLOTS[key] = next_slot.value
+                next_slot.value += 1
+            if slot < self.n_slots:
+                pids[slot] = os.getpid()
+        if slot < self.n_slots:
+            # Each process owns its slot: no locking needed
+            peak = peak_rss()
+            own = peak - _BASELINES.get(key, peak)
+            if self.private:
+                private = private_memory()
+                if private is not None:
+                    own = max(own, private)
+            peaks[slot] = peak
+            own_peaks[slot] = max(own_peaks[slot], own)
+
+    def report(self):
+        """
+        Return the list of (pid, peak resident set size in bytes) pairs of
+        the workers
+        """
+        if self._state is None:
+            return []
+        pids, peaks, next_slot, _, _, _, _ = self._state
+        return [(pids[i], peaks[i])
+                for i in xrange(min(next_slot.value, self.n_slots))]
+
+    def report_own(self):
+        """
+        Return the list of (pid, peak of its own memory in bytes) pairs of
+        the workers
+        """
+        if self._state is None:
+            return []
+        pids, _, next_slot, _, _, _, own_peaks = self._state
+        return [(pids[i], own_peaks[i])
+                for i in xrange(min(next_slot.value, self.n_slots))]
+
+    @property
+    def throttled_time(self):
+        """The total time the workers spent throttled (in seconds)"""
+        if self._state is None:
+            return 0.
+        return self._state[4].value
+
+    def close(self):
+        _MONITORS.pop(self._key, None)
+        super(MemoryMonitor, self).close()
+
+
+def _inherited_monitor(key):
+    """Return the :class:`MemoryMonitor` of the given key in this process"""
+    monitor = _MONITORS.get(key)
+    if monitor is None:
+        # The pool was started before the monitor: nothing to report to
+        monitor = MemoryMonitor.__new__(MemoryMonitor)
+        monitor._key = key
+        monitor._state = None
+    return monitor
+
+
+class _Watched(object):
+    """A worker-level task reporting to a :class:`MemoryMonitor`"""
+
+    def __init__(self, task, monitor):
+        self.task = task
+        self.monitor = monitor
+
+    def __reduce__(self):
+        # Shipped along with each task
+        return _Watched, (self.task, self.monitor)
+
+    def __call__(self, *args):
+        self.monitor.enter()
+        try:
+            return self.task(*args)
+        finally:
+            self.monitor.exit()
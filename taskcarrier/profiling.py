@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Profiling of the code run by the workers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import cProfile
+import pstats
+from thread import get_ident
+
+
+# The raw statistics of the threads started by a profiled task, by the
+# identifier of the thread running that task
+_THREAD_STATS = {}
+
+
+class _RawStats(object):
+    """Profiling statistics in the form :class:`pstats.Stats` loads"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Profiled(object):
+    """
+    ========
+    Profiled
+    ========
+    A :class:`Profiled` callable runs the given task under cProfile and
+    returns a pair (output of the task, raw profiling statistics). The raw
+    statistics are a picklable dict which can be shipped back to the parent
+    and merged with :func:`merge_stats`. The threads the task starts with a
+    target wrapped by :func:`profile_thread` are profiled as well and merged
+    into those statistics.
+
+    Constructor parameters
+    ----------------------
+    task : callable
+        The task to profile
+    """
+
+    def __init__(self, task):
+        self.task = task
+
+    def __call__(self, *args):
+        ident = get_ident()
+        threads_stats = _THREAD_STATS[ident] = []
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            output = self.task(*args)
+        finally:
+            profiler.disable()
+            del _THREAD_STATS[ident]
+        profiler.create_stats()
+        if len(threads_stats) == 0:
+            return output, profiler.stats
+        return output, merge_stats([profiler.stats] + threads_stats).stats
+
+
+def profile_thread(target):
+    """
+    Return the `target` of a thread so that, if the calling thread runs a
+    :class:`Profiled` task, the thread is profiled into the statistics of
+    that task. Otherwise, return `target` itself
+
+    Parameters
+    ----------
+    target : callable
+        The target of the thread (to wrap before starting the thread)
+    """
+    threads_stats = _THREAD_STATS.get(get_ident())
+    if threads_stats is None:
+        return target
+
+    def profiled(*args):
+        output, stats = Profiled(target)(*args)
+        threads_stats.append(stats)
+        return output
+    return profiled
+
+
+def merge_stats(raw_stats, path=None):
+    """
+    Merge raw profiling statistics into a single :class:`pstats.Stats`
+
+    Parameters
+    ----------
+    raw_stats : iterable of dict
+        The raw statistics (see :class:`Profiled`)
+    path : str or None (Default : None)
+        If not None, the merged statistics are also dumped into that file
+        (which can be loaded later with :class:`pstats.Stats`)
+
+    Return
+    ------
+    stats : :class:`pstats.Stats` or None
+        The merged statistics (None if there is nothing to merge)
+    """
+    # pstats refuses to load empty statistics
+    raw_stats = [_RawStats(raw) for raw in raw_stats if len(raw) > 0]
+    if len(raw_stats) == 0:
+        return None
+    stats = pstats.Stats(raw_stats[0])
+    if len(raw_stats) > 1:
+        stats.add(*raw_stats[1:])
+    if path is not None:
+        stats.dump_stats(path)
+    return stats
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Low-overhead progress monitoring of the parallel mappers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import sys
+import time
+from threading import Thread, Event
+
+from .shared import InheritedState
+
+
+
+class ProgressCounter(InheritedState):
+    """
+    ===============
+    ProgressCounter
+    ===============
+    A :class:`ProgressCounter` is a cheap counter shared between the parent
+    process and its workers. It is divided into slots: a writer which owns
+    a slot can increment it without locking. Writers which do not own a slot
+    share a locked one.
+
+    The counter must be created before the worker pool is started (so that
+    the workers inherit it). A worker which cannot find it silently ignores
+    the increments.
+
+    Constructor parameters
+    ----------------------
+    n_slots : int (>0) (Default : 1)
+        The number of lock-free slots
+    """
+
+    def __init__(self, n_slots=1):
+        from multiprocessing import RawArray, Lock
+        self._share((RawArray('l', max(n_slots, 1) + 1), Lock()))
+
+    def increment(self, slot=None, n=1):
+        """
+        Increment the counter by `n`
+
+        Parameters
+        ----------
+        slot : int or None (Default : None)
+            The slot owned by the writer. If None, the shared locked slot
+            is used
+        n : int (Default : 1)
+            The increment
+        """
+        if self._state is None:
+            return
+        counts, lock = self._state
+        if slot is None:
+            with lock:
+                counts[0] += n
+        else:
+            counts[slot + 1] += n
+
+    @property
+    def value(self):
+        """The total count"""
+        if self._state is None:
+            return 0
+        return sum(self._state[0][:])
+
+
+
+class Progress(object):
+    """
+    ========
+    Progress
+    ========
+    A :class:`Progress` is a snapshot of the progression of a run.
+
+    Attributes
+    ----------
+    done : int
+        The number of items processed so far
+    total : int or None
+        The total number of items (None if unknown)
+    elapsed : float
+        The time since the start of the run (in seconds)
+    """
+
+    def __init__(self, done, total, elapsed):
+        self.done = done
+        self.total = total
+        self.elapsed = elapsed
+
+    @property
+    def rate(self):
+        """The throughput in items/sec"""
+        if self.elapsed <= 0:
+            return 0.
+        return self.done / self.elapsed
+
+    @property
+    def eta(self):
+        """The estimated time before completion (in seconds) or None"""
+        if self.total is None:
+            return None
+        if self.done >= self.total:
+            return 0.
+        rate = self.rate
+        if rate <= 0:
+            return None
+        return (self.total - self.done) / rate
+
+    def __str__(self):
+        total = "?" if self.total is None else str(self.total)
+        eta = "?" if self.eta is None else "%.1fs" % self.eta
+        return "%d/%s items (%.1f items/sec, ETA %s)" % (self.done, total,
+                                                         self.rate, eta)
+
+    def __repr__(self):
+        return "Progress(done=%r, total=%r, elapsed=%r)" % (self.done,
+                                                            self.total,
+                                                            self.elapsed)
+
+
+def print_progress(progress, stream=None):
+    """A progress callback writing the progression on a single line"""
+    if stream is None:
+        stream = sys.stderr
+    stream.write("\r" + str(progress))
+    if progress.total is not None and progress.done >= progress.total:
+        stream.write("\n")
+    stream.flush()
+
+
+
+class ProgressMonitor(object):
+    """
+    ===============
+    ProgressMonitor
+    ===============
+    A :class:`ProgressMonitor` polls a :class:`ProgressCounter` from a
+    background thread and reports a :class:`Progress` snapshot to a callback
+    at a fixed rate. A last report is always issued when the monitor stops.
+
+    Constructor parameters
+    ----------------------
+    counter : :class:`ProgressCounter`
+        The counter to poll
+    total : int or None
+        The total number of items (None if unknown)
+    callback : callable
+        A function taking a :class:`Progress` instance
+    interval : float (>0) (Default : 1.)
+        The time (in seconds) between two reports
+    """
+
+    def __init__(self, counter, total, callback, interval=1.):
+        self.counter = counter
+        self.total = total
+        self.callback = callback
+        self.interval = interval
+        self._stop = Event()
+        self._thread = None
+        self._start_time = None
+
+    def snapshot(self):
+        """Return the current :class:`Progress`"""
+        return Progress(self.counter.value, self.total,
+                        time.time() - self._start_time)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.callback(self.snapshot())
+
+    def start(self):
+        self._start_time = time.time()
+        self._thread = Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.callback(self.snapshot())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+        return False
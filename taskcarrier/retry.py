@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Fault tolerance of the parallel mappers: per chunk retries and partial
+results
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import traceback
+
+from .shared import InheritedState
+
+
+WORKER_CRASHED = "The worker process died while processing the item"
+
+
+class MapResult(list):
+    """
+    =========
+    MapResult
+    =========
+    A :class:`MapResult` is the list of the results of a map which may have
+    partially failed. The result of a failed item is None.
+
+    Attributes
+    ----------
+    failures : dict
+        Maps the index of each failed item to the description of its
+        (last) error
+    """
+
+    def __init__(self, results, failures=None):
+        super(MapResult, self).__init__(results)
+        self.failures = {} if failures is None else failures
+
+    @property
+    def failed_indices(self):
+        """The sorted list of the indices of the failed items"""
+        return sorted(self.failures)
+
+
+class MapFailure(Exception):
+    """
+    Raised when some items still fail after all the retries. The
+    :class:`MapResult` holding the successful results is available as the
+    `result` attribute so that only the failed part need be recomputed
+    """
+
+    def __init__(self, result):
+        indices = result.failed_indices
+        first = result.failures[indices[0]]
+        msg = "%d item(s) failed (indices %s). First error:\n%s" % (
+            len(indices), indices[:10], first)
+        super(MapFailure, self).__init__(msg)
+        self.result = result
+
+
+class TaskTracker(InheritedState):
+    """
+    ===========
+    TaskTracker
+    ===========
+    A :class:`TaskTracker` records which worker process runs each task, so
+    that the parent can detect tasks lost because their worker died.
+
+    Constructor parameters
+    ----------------------
+    n_tasks : int (>0)
+        The maximum number of tasks to track
+    """
+
+    def __init__(self, n_tasks):
+        from multiprocessing import RawArray
+        self._parent = os.getpid()
+        self._share(RawArray('l', max(n_tasks, 1)))
+
+    def started(self, task_id):
+        """Record that the calling worker starts the task"""
+        if self._state is not None:
+            self._state[task_id] = os.getpid()
+
+    def clear(self, task_id):
+        """Forget the worker of the task (before its id is reused)"""
+        if self._state is not None:
+            self._state[task_id] = 0
+
+    def crashed(self, task_id):
+        """Whether the worker which started the task has died"""
+        pid = self._state[task_id]
+        if pid <= 0 or pid == self._parent:
+            return False
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return True
+        return False
+
+
+class _Tracked(object):
+    """
+    A worker-level task recording its worker in a :class:`TaskTracker`
+    before delegating, so that the loss of the worker is detected even if
+    it dies before the task proper (e.g. in the initializer)
+    """
+
+    def __init__(self, task):
+        self.task = task
+
+    def __call__(self, tracker, task_id, *args):
+        tracker.started(task_id)
+        return self.task(*args)
+
+
+def map_chunk_safe(function, chunk, counter=None):
+    """
+    Apply `function` on each tuple of arguments of `chunk`, catching the
+    errors
+
+    Return
+    ------
+    results : list
+        The results (None for the failed items)
+    failures : dict
+        Maps the index (within the chunk) of the failed items to the
+        formatted traceback
+    """
+    results = []
+    failures = {}
+    for i, args in enumerate(chunk):
+        try:
+            results.append(function(*args))
+        except Exception:
+            results.append(None)
+            failures[i] = traceback.format_exc()
+            continue
+        if counter is not None:
+            counter.increment()
+    return results, failures
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Priority and fair-share scheduling of concurrent maps on a shared pool
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import time
+import threading
+from collections import deque
+
+from .taskcarrier import (Mapper, DynamicParallelMapper, RunStats, _map_chunk,
+                          _new_pool)
+from .retry import TaskTracker, WORKER_CRASHED
+
+
+def _map_chunk_tracked(tracker, slot, function, chunk):
+    """Record the worker processing the chunk in `tracker` and process it"""
+    tracker.started(slot)
+    return _map_chunk(function, chunk)
+
+
+class Job(object):
+    """
+    ===
+    Job
+    ===
+    A :class:`Job` is a map submitted to a :class:`FairScheduler`. Its items
+    are split into chunks which the scheduler dispatches to the pool.
+
+    Attributes
+    ----------
+    priority : number
+        The priority of the job
+    tenant : hashable
+        The tenant the job is accounted to
+    stats : :class:`RunStats` or None
+        The statistics of the job once it is done. Besides the `elapsed` time
+        since the submission, its `wait_time` attribute is the time spent
+        before the first chunk was dispatched
+    """
+
+    def __init__(self, function, items, priority, tenant, chunk_size):
+        self.function = function
+        self.priority = priority
+        self.tenant = tenant
+        self.n_items = len(items)
+        self.chunks = deque((start, items[start:start+chunk_size])
+                            for start in xrange(0, len(items), chunk_size))
+        self.n_left = len(self.chunks)
+        self.results = [None] * len(items)
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.stats = None
+        self._done = threading.Event()
+
+    def ready(self):
+        """Whether the job is done"""
+        return self._done.is_set()
+
+    def get(self):
+        """
+        Wait for the job to be done and return its results (re-raise the
+        error of the first failed chunk, if any)
+        """
+        # Waiting without a timeout cannot be interrupted in Python 2
+        while not self._done.wait(1.):
+            pass
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+class FairScheduler(object):
+    """
+    =============
+    FairScheduler
+    =============
+    A :class:`FairScheduler` runs the maps submitted concurrently (typically
+    from several threads) on a single worker pool. Instead of running one
+    map after the other, it interleaves their chunks and keeps at most one
+    chunk per worker in flight, so that a new job only waits for the chunks
+    being processed.
+
+    Whenever a worker is available, the next chunk is taken from the jobs
+    of highest priority. Among those, the tenants share the workers in
+    proportion to their weights (weighted fair queuing on the number of
+    items dispatched) and the jobs of a tenant run in submission order. A
+    tenant joining is not credited for the time it was idle.
+
+    Constructor parameters
+    ----------------------
+    mapper : :class:`Mapper` or None (Default : None)
+        The mapper whose pool settings (number of workers, backend and
+        temporary folder) to use. With a :class:`SerialMapper`, the chunks
+        are run one at a time by the scheduler thread. If None, a default
+        :class:`DynamicParallelMapper`
+    chunk_size : int (>0) (Default : 1)
+        The number of items per chunk. The smaller, the sooner a worker can
+        be given to a new job but the higher the dispatching overhead
+    weights : dict or None (Default : None)
+        The weight of each tenant (1 for those not in the dict)
+
+    Intended usage
+    --------------
+    >>> from taskcarrier import SerialMapper
+    >>> with FairScheduler(SerialMapper()) as scheduler:
+    ...     batch = scheduler.submit(abs, range(-100, 0), tenant="batch")
+    ...     scheduler.map(abs, [-1, -2], priority=10)
+    [1, 2]
+    """
+
+    def __init__(self, mapper=None, chunk_size=1, weights=None):
+        if mapper is None:
+            mapper = DynamicParallelMapper()
+        self.mapper = mapper
+        self.chunk_size = chunk_size
+        self.weights = {} if weights is None else dict(weights)
+        self.n_slots = getattr(mapper, "n_jobs", 1)
+        self._condition = threading.Condition()
+        # The unfinished jobs, in submission order
+        self._jobs = []
+        # The virtual time of each tenant
+        self._vtimes = {}
+        # The virtual time of the last chunk dispatched
+        self._clock = 0.
+        self._in_flight = []
+        # Each chunk in flight owns a slot of the tracker
+        self._free_slots = range(self.n_slots)
+        self._tracker = None
+        self._pool = None
+        self._thread = None
+        self._closed = False
+
+    def _start(self):
+        if hasattr(self.mapper, "n_jobs"):
+            self.mapper.warm_up()
+            # The tracker must be created before the pool is forked
+            self._tracker = TaskTracker(self.n_slots)
+            self._pool = _new_pool(self.mapper.n_jobs, self.mapper.backend,
+                                   self.mapper.temp_folder)
+        self._thread = threading.Thread(target=self._dispatch)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, function, seq1, *seqs, **kwargs):
+        """
+        submit(function, sequence[, sequence, ...], priority=0, tenant=None)
+        -> :class:`Job`
+
+        Submit the mapping of `function` on the sequences (see
+        :meth:`Mapper.map`) with the given priority (the higher, the sooner)
+        on behalf of the given tenant, and return the :class:`Job` without
+        waiting for it
+        """
+        priority = kwargs.pop("priority", 0)
+        tenant = kwargs.pop("tenant", None)
+        if len(kwargs) > 0:
+            raise TypeError("Unexpected keyword arguments: %s"
+                            % ", ".join(sorted(kwargs)))
+        job = Job(function, zip(seq1, *seqs), priority, tenant,
+                  self.chunk_size)
+        with self._condition:
+            if self._closed:
+                raise ValueError("The scheduler is closed")
+            if self._thread is None:
+                self._start()
+            if job.n_items == 0:
+                self._end(job)
+                return job
+            # No credit for the time the tenant was idle
+            self._vtimes[tenant] = max(self._vtimes.get(tenant, 0.),
+                                       self._clock)
+            self._jobs.append(job)
+            self._condition.notify()
+        return job
+
+    def map(self, function, seq1, *seqs, **kwargs):
+        """
+        map(function, sequence[, sequence, ...], priority=0, tenant=None)
+        -> list
+
+        Like :meth:`submit` but wait for the results
+        """
+        return self.submit(function, seq1, *seqs, **kwargs).get()
+
+    def mapper_for(self, priority=0, tenant=None):
+        """
+        Return a :class:`ScheduledMapper` submitting its maps to this
+        scheduler with the given priority and tenant
+        """
+        return ScheduledMapper(self, priority, tenant)
+
+    def _wake(self, _=None):
+        with self._condition:
+            self._condition.notify()
+
+    def _next_job(self):
+        """Return the job whose chunk to dispatch next (or None)"""
+        candidates = [job for job in self._jobs if len(job.chunks) > 0]
+        if len(candidates) == 0:
+            return None
+        priority = max(job.priority for job in candidates)
+        # The first one wins ties: the jobs of a tenant are served in order
+        return min((job for job in candidates if job.priority == priority),
+                   key=lambda job: self._vtimes[job.tenant])
+
+    def _send(self, job):
+        start, chunk = job.chunks.popleft()
+        self._clock = self._vtimes[job.tenant]
+        self._vtimes[job.tenant] += (len(chunk)
+                                     / float(self.weights.get(job.tenant, 1)))
+        if job.started is None:
+            job.started = time.time()
+        if self._pool is not None:
+            slot = self._free_slots.pop()
+            self._tracker.clear(slot)
+            outcome = self._pool.apply_async(_map_chunk_tracked,
+                                             (self._tracker, slot,
+                                              job.function, chunk),
+                                             callback=self._wake)
+            self._in_flight.append((outcome, job, start, slot))
+            return
+        # Let the jobs be submitted while the chunk is processed
+        self._condition.release()
+        try:
+            try:
+                results, error = _map_chunk(job.function, chunk), None
+            except Exception as exception:
+                results, error = None, exception
+        finally:
+            self._condition.acquire()
+        self._finish(job, start, results, error)
+
+    def _collect(self):
+        """Process the chunks which are done"""
+        in_flight = []
+        for outcome, job, start, slot in self._in_flight:
+            if outcome.ready():
+                try:
+                    results, error = outcome.get(), None
+                except Exception as exception:
+                    results, error = None, exception
+            elif self._tracker.crashed(slot):
+                # The pool replaces the worker but never completes the chunk
+                results, error = None, RuntimeError(WORKER_CRASHED)
+            else:
+                in_flight.append((outcome, job, start, slot))
+                continue
+            self._free_slots.append(slot)
+            self._finish(job, start, results, error)
+        self._in_flight = in_flight
+
+    def _finish(self, job, start, results, error):
+        if job.ready():
+            # The job already failed
+            return
+        if error is not None:
+            job.error = error
+            job.chunks.clear()
+            self._end(job)
+            return
+        job.results[start:start+len(results)] = results
+        job.n_left -= 1
+        if job.n_left == 0:
+            self._end(job)
+
+    def _end(self, job):
+        now = time.time()
+        job.stats = RunStats(job.n_items, now - job.submitted)
+        job.stats.wait_time = (now if job.started is None
+                               else job.started) - job.submitted
+        if job in self._jobs:
+            self._jobs.remove(job)
+        job._done.set()
+
+    def _dispatch(self):
+        with self._condition:
+            while not self._closed:
+                self._collect()
+                while len(self._in_flight) < self.n_slots:
+                    job = self._next_job()
+                    if job is None:
+                        break
+                    self._send(job)
+                # The callback is not called on failed chunks nor on those
+                # lost with their worker
+                self._condition.wait(0.1)
+
+    def close(self):
+        """
+        Stop the scheduler and its pool. The unfinished jobs fail
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._tracker.close()
+        with self._condition:
+            for job in list(self._jobs):
+                job.error = RuntimeError("The scheduler was closed")
+                self._end(job)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+        return False
+
+
+class ScheduledMapper(Mapper):
+    """
+    ===============
+    ScheduledMapper
+    ===============
+    A :class:`ScheduledMapper` submits its maps to a :class:`FairScheduler`
+    with a fixed priority and tenant, so that code written against the
+    :class:`Mapper` interface can share the scheduler's pool. After each
+    call to :meth:`map`, the :attr:`stats` attribute holds the
+    :class:`RunStats` of the job.
+
+    Constructor parameters
+    ----------------------
+    scheduler : :class:`FairScheduler`
+        The scheduler
+    priority : number (Default : 0)
+        The priority of the maps (the higher, the sooner)
+    tenant : hashable (Default : None)
+        The tenant the maps are accounted to
+    """
+
+    def __init__(self, scheduler, priority=0, tenant=None):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.tenant = tenant
+        self.stats = None
+
+    def map(self, function, seq1, *seqs):
+        job = self.scheduler.submit(function, seq1, *seqs,
+                                    priority=self.priority,
+                                    tenant=self.tenant)
+        try:
+            return job.get()
+        finally:
+            self.stats = job.stats
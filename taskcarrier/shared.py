@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+State shared with the workers by inheritance
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import itertools
+
+
+# Shared states alive in this process, indexed by key. Worker processes
+# inherit this registry when the pool is forked, which is how a pickled
+# :class:`InheritedState` finds back its shared memory (synchronized objects
+# cannot be sent through the pool queues)
+_REGISTRY = {}
+_KEYS = itertools.count()
+
+
+class InheritedState(object):
+    """
+    ==============
+    InheritedState
+    ==============
+    An :class:`InheritedState` is the base class of objects holding shared
+    memory (or locks) which must reach the workers. Only a key is pickled;
+    the worker looks the state up in the registry it inherited when the pool
+    was forked. A worker which cannot find the state (e.g. the pool was
+    started before the state) gets None as state.
+
+    The state must therefore be created before the worker pool is started.
+    """
+
+    def _share(self, state):
+        """Register `state` as the shared state of this object"""
+        self._key = (os.getpid(), next(_KEYS))
+        self._state = state
+        _REGISTRY[self._key] = state
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d["_state"] = None
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self._state = _REGISTRY.get(self._key)
+
+    def close(self):
+        """Release the state from the registry"""
+        _REGISTRY.pop(self._key, None)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Reduction by key of the (key, value) pairs produced by the workers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import cPickle as pickle
+
+
+def combine(pairs, reducer, into=None):
+    """
+    Reduce the values of the (key, value) `pairs` by key with the binary
+    function `reducer` and return the dict mapping each key to its reduced
+    value. The pairs are reduced into the dict `into` if it is given
+
+    Example
+    -------
+    >>> combine([("a", 1), ("b", 2), ("a", 3)], lambda x, y: x + y)
+    {'a': 4, 'b': 2}
+    """
+    if into is None:
+        into = {}
+    for key, value in pairs:
+        if key in into:
+            into[key] = reducer(into[key], value)
+        else:
+            into[key] = value
+    return into
+
+
+def bucket_of(key, n_buckets):
+    """Return the bucket of `key` among `n_buckets`"""
+    # The workers are forked from the parent: they share its hash seed
+    return hash(key) % n_buckets
+
+
+def _bucket_path(folder, name, bucket):
+    return os.path.join(folder, "%s-%d.pkl" % (name, bucket))
+
+
+def combine_chunk(function, reducer, chunk, n_buckets, folder, name,
+                  counter=None, slot=None):
+    """
+    Combine the pairs produced by `function` on each tuple of arguments of
+    `chunk` (any iterable) and store each bucket of the combined pairs in
+    its own file of `folder` (empty buckets are not stored). Return the
+    number of items
+    """
+    combined = {}
+    n_items = 0
+    for args in chunk:
+        n_items += 1
+        combine(function(*args), reducer, combined)
+        if counter is not None:
+            counter.increment(slot)
+    buckets = [[] for _ in xrange(n_buckets)]
+    for pair in combined.iteritems():
+        buckets[bucket_of(pair[0], n_buckets)].append(pair)
+    for bucket, pairs in enumerate(buckets):
+        if len(pairs) > 0:
+            with open(_bucket_path(folder, name, bucket), "wb") as hdl:
+                pickle.dump(pairs, hdl, pickle.HIGHEST_PROTOCOL)
+    return n_items
+
+
+def reduce_bucket(reducer, folder, names, bucket):
+    """
+    Reduce the pairs of the given bucket stored by :func:`combine_chunk`
+    under the given `names` and return the dict of the reduced values
+    """
+    reduced = {}
+    for name in names:
+        path = _bucket_path(folder, name, bucket)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as hdl:
+            combine(pickle.load(hdl), reducer, reduced)
+    return reduced
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Offline simulation of the scheduling policies of the mappers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import time
+import heapq
+
+from .taskcarrier import Partition
+
+
+POLICIES = ("serial", "static", "dynamic", "chunked")
+
+
+class Simulation(object):
+    """
+    ==========
+    Simulation
+    ==========
+    A :class:`Simulation` is the predicted outcome of a map replayed by
+    :func:`simulate`.
+
+    Attributes
+    ----------
+    policy : str
+        The scheduling policy
+    n_jobs : int
+        The number of workers
+    n_tasks : int
+        The number of tasks dispatched to the workers
+    makespan : float
+        The predicted duration of the map (in seconds)
+    busy : list of float
+        The time each worker spent processing items
+    options : dict
+        The options of the policy
+    """
+
+    def __init__(self, policy, n_jobs, n_tasks, makespan, busy, options):
+        self.policy = policy
+        self.n_jobs = n_jobs
+        self.n_tasks = n_tasks
+        self.makespan = makespan
+        self.busy = busy
+        self.options = options
+
+    @property
+    def utilization(self):
+        """The fraction of the worker time spent processing items"""
+        if self.makespan <= 0:
+            return 0.
+        return sum(self.busy) / (self.n_jobs * self.makespan)
+
+    def __repr__(self):
+        options = "".join(", %s=%r" % item
+                          for item in sorted(self.options.items()))
+        return ("Simulation(policy=%r, n_jobs=%d%s, makespan=%.4g, "
+                "utilization=%.3f)" % (self.policy, self.n_jobs, options,
+                                       self.makespan, self.utilization))
+
+
+def _replay(tasks, n_jobs, dispatch, startup):
+    """
+    Replay the `tasks` (lists of item durations, in dispatching order) on
+    `n_jobs` workers. The parent sends a task every `dispatch` seconds, from
+    `startup` on, and an idle worker takes the oldest task sent. Return the
+    makespan and the busy time of each worker
+    """
+    # (time the worker gets idle, worker index)
+    workers = [(startup, worker) for worker in xrange(n_jobs)]
+    busy = [0.] * n_jobs
+    makespan = startup
+    for i, task in enumerate(tasks):
+        sent = startup + (i + 1) * dispatch
+        idle, worker = heapq.heappop(workers)
+        duration = sum(task)
+        end = max(idle, sent) + duration
+        busy[worker] += duration
+        makespan = max(makespan, end)
+        heapq.heappush(workers, (end, worker))
+    return makespan, busy
+
+
+def simulate(durations, policy, n_jobs=1, dispatch=0., startup=0.,
+             chunks_per_worker=1, chunk_size=None):
+    """
+    Predict the makespan of a map by replaying the duration of each item
+    under the given scheduling policy
+
+    Parameters
+    ----------
+    durations : sequence of float
+        The duration of each item, in order (see :func:`record_durations`)
+    policy : str
+        The scheduling policy, one of
+            "serial" : the items are processed one after the other by the
+            parent (:class:`SerialMapper`)
+            "static" : the items are split into n_jobs * chunks_per_worker
+            contiguous chunks (:class:`StaticParallelMapper`)
+            "dynamic" : each item is a task on its own
+            (:class:`DynamicParallelMapper`)
+            "chunked" : the items are split into contiguous chunks of
+            `chunk_size` items (as by a :class:`FairScheduler`)
+    n_jobs : int (>0) (Default : 1)
+        The number of workers
+    dispatch : float (>=0) (Default : 0.)
+        The time the parent needs to send a task, e.g. the `dispatch_time`
+        of an :class:`Advice`
+    startup : float (>=0) (Default : 0.)
+        The fixed cost of a parallel map, e.g. the `startup_time` of an
+        :class:`Advice`
+    chunks_per_worker : int (>0) (Default : 1)
+        The number of chunks per worker of the "static" policy
+    chunk_size : int (>0) or None (Default : None)
+        The number of items per chunk of the "chunked" policy
+
+    Return
+    ------
+    simulation : :class:`Simulation`
+        The predicted makespan and utilization
+
+    Note
+    ----
+    :lib:`joblib` may group consecutive short tasks into batches, which
+    the simulation does not model: the actual static mapper with several
+    chunks per worker can be less balanced than predicted
+
+    Example
+    -------
+    >>> durations = [4., 1., 1., 1., 1.]
+    >>> simulate(durations, "static", n_jobs=2).makespan
+    6.0
+    >>> simulate(durations, "dynamic", n_jobs=2).makespan
+    4.0
+    """
+    durations = list(durations)
+    options = {}
+    if policy == "serial":
+        n_jobs = 1
+        tasks = [durations]
+        dispatch = startup = 0.
+    elif policy == "static":
+        options["chunks_per_worker"] = chunks_per_worker
+        tasks = [durations[sl] for sl in Partition(n_jobs * chunks_per_worker,
+                                                   len(durations))]
+    elif policy == "dynamic":
+        tasks = [[duration] for duration in durations]
+    elif policy == "chunked":
+        if chunk_size is None:
+            raise ValueError("The chunked policy needs a chunk_size")
+        options["chunk_size"] = chunk_size
+        tasks = [durations[start:start+chunk_size]
+                 for start in xrange(0, len(durations), chunk_size)]
+    else:
+        raise ValueError("Unknown policy: %s, expected one of %r"
+                         % (policy, POLICIES))
+    makespan, busy = _replay(tasks, n_jobs, dispatch, startup)
+    return Simulation(policy, n_jobs, len(tasks), makespan, busy, options)
+
+
+def compare(durations, n_jobs_values, dispatch=0., startup=0.,
+            chunks_per_worker_values=(1,), chunk_sizes=()):
+    """
+    Simulate the serial policy and each combination of the other policies,
+    number of workers and options. Return the list of the
+    :class:`Simulation` sorted by makespan (the best first)
+    """
+    simulations = [simulate(durations, "serial")]
+    for n_jobs in n_jobs_values:
+        simulations.append(simulate(durations, "dynamic", n_jobs, dispatch,
+                                    startup))
+        for chunks_per_worker in chunks_per_worker_values:
+            simulations.append(simulate(durations, "static", n_jobs,
+                                        dispatch, startup,
+                                        chunks_per_worker=chunks_per_worker))
+        for chunk_size in chunk_sizes:
+            simulations.append(simulate(durations, "chunked", n_jobs,
+                                        dispatch, startup,
+                                        chunk_size=chunk_size))
+    return sorted(simulations, key=lambda simulation: simulation.makespan)
+
+
+class _Timed(object):
+    """A callable returning the result of the function and its duration"""
+
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, *args):
+        start = time.time()
+        result = self.function(*args)
+        return result, time.time() - start
+
+
+def record_durations(mapper, function, seq1, *seqs):
+    """
+    Map `function` with the `mapper` while recording the duration of each
+    item. Return the list of the results and the list of the durations
+    """
+    outputs = mapper.map(_Timed(function), seq1, *seqs)
+    return [result for result, _ in outputs], [elapsed for _, elapsed
+                                               in outputs]
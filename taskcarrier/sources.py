@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Inputs read by the workers themselves
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import mmap
+
+
+class FileSource(object):
+    """
+    ==========
+    FileSource
+    ==========
+    A :class:`FileSource` is the sequence of the records (the lines, by
+    default) of a file. When given to a parallel mapper, the file is split
+    into byte ranges by a :class:`Partition` and each worker memory-maps the
+    file and parses only the records starting within its own range. Only
+    the path and the byte offsets are sent to the workers.
+
+    A record belongs to the range holding its first byte, so that the ranges
+    need not be aligned on record boundaries beforehand. The records are
+    returned without their delimiter.
+
+    Constructor parameters
+    ----------------------
+    path : str
+        The path of the file
+    delimiter : str (Default : "\\n")
+        The record delimiter
+
+    Example
+    -------
+    >>> import tempfile
+    >>> path = tempfile.mktemp()
+    >>> with open(path, "w") as hdl:
+    ...     hdl.write("alpha\\nbeta\\ngamma\\n")
+    >>> source = FileSource(path)
+    >>> source.ranges(2)
+    [(0, 9), (9, 17)]
+    >>> list(source.read_range(0, 9)), list(source.read_range(9, 17))
+    (['alpha', 'beta'], ['gamma'])
+    """
+
+    def __init__(self, path, delimiter="\n"):
+        self.path = path
+        self.delimiter = delimiter
+
+    @property
+    def size(self):
+        """The size of the file (in bytes)"""
+        return os.path.getsize(self.path)
+
+    def ranges(self, nb_parts):
+        """
+        Return at most `nb_parts` contiguous byte ranges (start, stop)
+        covering the file
+        """
+        from .taskcarrier import Partition
+        size = self.size
+        if size == 0:
+            return []
+        return [(sl.start, sl.stop) for sl in Partition(nb_parts, size)]
+
+    def read_range(self, start, stop):
+        """
+        Yield the records whose first byte lies in [start, stop)
+        """
+        if start >= stop:
+            return
+        delimiter = self.delimiter
+        with open(self.path, "rb") as hdl:
+            mm = mmap.mmap(hdl.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                size = len(mm)
+                pos = start
+                if start > 0:
+                    # The first record starting at or after `start` follows
+                    # the first delimiter ending at or after `start`
+                    pos = mm.find(delimiter, max(start - len(delimiter), 0))
+                    if pos == -1:
+                        return
+                    pos += len(delimiter)
+                while pos < min(stop, size):
+                    end = mm.find(delimiter, pos)
+                    if end == -1:
+                        end = size
+                    yield mm[pos:end]
+                    pos = end + len(delimiter)
+            finally:
+                mm.close()
+
+    def __iter__(self):
+        return self.read_range(0, self.size)
+
+
+def map_file_range(function, source, start, stop, counter=None, slot=None):
+    """
+    Apply `function` on each record of `source` starting in [start, stop)
+    """
+    results = []
+    for record in source.read_range(start, stop):
+        results.append(function(record))
+        if counter is not None:
+            counter.increment(slot)
+    return results
+
+
+class RecordArgs(object):
+    """
+    The tuples of arguments (record,) of the records of `source` starting in
+    [start, stop), read when iterated (by the worker)
+    """
+
+    def __init__(self, source, start, stop):
+        self.source = source
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self):
+        for record in self.source.read_range(self.start, self.stop):
+            yield (record,)
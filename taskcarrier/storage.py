@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""
+Out-of-core storage of the results of the mappers
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import shutil
+import cPickle as pickle
+from bisect import bisect_right
+
+
+# The Python scalar types stored in a .npy file and converted back when
+# loaded
+_SCALAR_TYPES = (bool, int, long, float, complex)
+
+
+class PickleChunk(object):
+    """
+    ===========
+    PickleChunk
+    ===========
+    A :class:`PickleChunk` is a sequence of results stored in a file as
+    consecutive pickles. The offset of each pickle is kept so that any
+    result can be loaded on its own.
+
+    Constructor parameters
+    ----------------------
+    path : str
+        The path of the file
+    offsets : list of int
+        The offset of each result in the file
+    """
+
+    def __init__(self, path, offsets):
+        self.path = path
+        self.offsets = offsets
+        self._hdl = None
+
+    @classmethod
+    def write(cls, results, path):
+        """Store the results in the file `path`"""
+        offsets = []
+        with open(path, "wb") as hdl:
+            for result in results:
+                offsets.append(hdl.tell())
+                pickle.dump(result, hdl, pickle.HIGHEST_PROTOCOL)
+        return cls(path, offsets)
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d["_hdl"] = None
+        return d
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if self._hdl is None:
+            self._hdl = open(self.path, "rb")
+        self._hdl.seek(self.offsets[index])
+        return pickle.load(self._hdl)
+
+    def close(self):
+        if self._hdl is not None:
+            self._hdl.close()
+            self._hdl = None
+
+
+class NpyChunk(object):
+    """
+    ========
+    NpyChunk
+    ========
+    A :class:`NpyChunk` is a sequence of numeric results (numbers of the same
+    type or arrays of the same shape and dtype) stored in a .npy file and
+    accessed through a memmap.
+
+    Constructor parameters
+    ----------------------
+    path : str
+        The path of the .npy file
+    length : int
+        The number of results
+    scalar_type : type or None (Default : None)
+        If not None, the Python scalar type of the results (e.g. int or
+        float) to convert the loaded values back to. Otherwise, they are
+        returned as numpy scalars or arrays
+    """
+
+    def __init__(self, path, length, scalar_type=None):
+        self.path = path
+        self.length = length
+        self.scalar_type = scalar_type
+        self._array = None
+
+    @classmethod
+    def write(cls, array, path, scalar_type=None):
+        """Store the array in the file `path`"""
+        import numpy as np
+        np.save(path, array)
+        return cls(path, len(array), scalar_type)
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d["_array"] = None
+        return d
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if self._array is None:
+            import numpy as np
+            self._array = np.load(self.path, mmap_mode="r")
+        if self.scalar_type is not None:
+            return self.scalar_type(self._array[index].item())
+        return self._array[index]
+
+    def close(self):
+        self._array = None
+
+
+def _numeric_layout(result):
+    """
+    Return the layout (type, dtype, shape, Python scalar type or None,
+    size in bytes) of a result that can be stored in a .npy file without
+    changing its type, or None: it must be a Python scalar, a numpy scalar
+    or an array of a numeric dtype
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    kind = type(result)
+    if kind in _SCALAR_TYPES:
+        scalar_type = kind
+    elif (issubclass(kind, np.number) or issubclass(kind, np.bool_) or
+          kind is np.ndarray):
+        scalar_type = None
+    else:
+        return None
+    array = np.asarray(result)
+    if array.dtype.kind not in "biufc":
+        # E.g. integers too large for int64
+        return None
+    return kind, array.dtype, array.shape, scalar_type, array.nbytes
+
+
+class Spiller(object):
+    """
+    =======
+    Spiller
+    =======
+    A :class:`Spiller` collects the results of a chunk as they are produced.
+    They are held in memory until their size reaches the threshold. From
+    then on, they are written to disk one by one: in a .npy file if they
+    all share the same numeric layout (see :class:`NpyChunk`), as
+    consecutive pickles otherwise (see :class:`PickleChunk`). The pickles
+    made to measure the size of the results are the ones written.
+
+    Constructor parameters
+    ----------------------
+    folder : str
+        The folder where to store the results
+    name : str
+        The base name of the file
+    threshold : int (>=0)
+        The size (in bytes) from which the results are stored on disk
+    length : int
+        The number of results of the chunk
+
+    Intended usage
+    --------------
+    >>> import tempfile
+    >>> spiller = Spiller(tempfile.mkdtemp(), "chunk", 100, 3)
+    >>> for result in ("a", "b" * 200, "c"):
+    ...     spiller.append(result)
+    >>> chunk = spiller.close()
+    >>> len(chunk), chunk[2]
+    (3, 'c')
+    """
+
+    def __init__(self, folder, name, threshold, length):
+        self.path = os.path.join(folder, name)
+        self.threshold = threshold
+        self.length = length
+        self._count = 0
+        self._size = 0
+        # Held until the threshold is reached
+        self._results = []
+        self._pickles = []
+        # The numeric layout of the results, None once they are pickled
+        self._layout = None
+        # The store of the results, once spilled
+        self._array = None
+        self._hdl = None
+        self._offsets = []
+
+    def append(self, result):
+        """Add the next result"""
+        if self._count == 0:
+            self._layout = _numeric_layout(result)
+        elif (self._layout is not None and
+              _numeric_layout(result) != self._layout):
+            self._to_pickles()
+        if self._array is not None:
+            self._array[self._count] = result
+        elif self._hdl is not None:
+            self._offsets.append(self._hdl.tell())
+            pickle.dump(result, self._hdl, pickle.HIGHEST_PROTOCOL)
+        else:
+            self._results.append(result)
+            if self._layout is None:
+                data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+                self._pickles.append(data)
+                self._size += len(data)
+            else:
+                self._size += self._layout[4]
+            if self._size >= self.threshold:
+                self._spill()
+        self._count += 1
+
+    def _spill(self):
+        """Write the held results to disk"""
+        if self._layout is not None:
+            from numpy.lib.format import open_memmap
+            _, dtype, shape = self._layout[:3]
+            self._array = open_memmap(self.path + ".npy", mode="w+",
+                                      dtype=dtype,
+                                      shape=(self.length,) + shape)
+            for i, result in enumerate(self._results):
+                self._array[i] = result
+        else:
+            self._hdl = open(self.path + ".pkl", "wb")
+            for data in self._pickles:
+                self._offsets.append(self._hdl.tell())
+                self._hdl.write(data)
+        self._results = self._pickles = None
+
+    def _to_pickles(self):
+        """Fall back on pickles: the results do not share the same layout"""
+        kind, scalar_type = self._layout[0], self._layout[3]
+        self._layout = None
+        if self._array is None:
+            self._pickles = [pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+                             for result in self._results]
+            self._size = sum(len(data) for data in self._pickles)
+            return
+        import numpy as np
+        array, self._array = self._array, None
+        self._hdl = open(self.path + ".pkl", "wb")
+        for i in xrange(self._count):
+            if scalar_type is not None:
+                result = scalar_type(array[i].item())
+            elif kind is np.ndarray:
+                result = np.array(array[i])
+            else:
+                result = array[i]
+            self._offsets.append(self._hdl.tell())
+            pickle.dump(result, self._hdl, pickle.HIGHEST_PROTOCOL)
+        del array
+        os.remove(self.path + ".npy")
+
+    def close(self):
+        """
+        Return the results: the list of the results themselves if they are
+        small enough, a :class:`NpyChunk` or a :class:`PickleChunk`
+        otherwise
+        """
+        if self._array is not None:
+            self._array.flush()
+            self._array = None
+            return NpyChunk(self.path + ".npy", self._count,
+                            self._layout[3])
+        if self._hdl is not None:
+            self._hdl.close()
+            self._hdl = None
+            return PickleChunk(self.path + ".pkl", self._offsets)
+        return self._results
+
+
+def spill(results, folder, name, threshold):
+    """
+    Store the results on disk if they are too large (see :class:`Spiller`)
+
+    Parameters
+    ----------
+    results : list
+        The results of a chunk
+    folder : str
+        The folder where to store the results
+    name : str
+        The base name of the file
+    threshold : int (>=0)
+        The size (in bytes) from which the results are stored on disk
+
+    Return
+    ------
+    chunk : list, :class:`NpyChunk` or :class:`PickleChunk`
+        The results themselves if they are small enough, an indexable
+        view of the stored results otherwise
+    """
+    spiller = Spiller(folder, name, threshold, len(results))
+    for result in results:
+        spiller.append(result)
+    return spiller.close()
+
+
+class ChunkedResults(object):
+    """
+    ==============
+    ChunkedResults
+    ==============
+    A :class:`ChunkedResults` is a lazy, indexable sequence of results made
+    of the concatenation of chunks. Each chunk is either held in memory (a
+    list) or stored on disk (see :func:`spill`). Random access only loads
+    the requested result.
+
+    The folder holding the stored chunks is deleted by :meth:`close` (or
+    when the sequence is garbage collected). Unpickled copies do not own the
+    folder and never delete it.
+
+    Constructor parameters
+    ----------------------
+    chunks : list of indexable sequences
+        The chunks
+    folder : str or None (Default : None)
+        The folder holding the stored chunks
+    """
+
+    def __init__(self, chunks, folder=None):
+        self.chunks = chunks
+        self.folder = folder
+        self._owner = True
+        self._starts = []
+        start = 0
+        for chunk in chunks:
+            self._starts.append(start)
+            start += len(chunk)
+        self._length = start
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self._owner = False
+
+    @property
+    def n_spilled(self):
+        """The number of chunks stored on disk"""
+        return sum(1 for chunk in self.chunks if not isinstance(chunk, list))
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in xrange(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("Index out of range: " + str(index))
+        chunk_index = bisect_right(self._starts, index) - 1
+        return self.chunks[chunk_index][index - self._starts[chunk_index]]
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            for i in xrange(len(chunk)):
+                yield chunk[i]
+
+    def __repr__(self):
+        return "ChunkedResults(length=%d, n_chunks=%d, n_spilled=%d)" % (
+            len(self), len(self.chunks), self.n_spilled)
+
+    def close(self):
+        """Release the stored chunks and delete their folder"""
+        for chunk in self.chunks:
+            if not isinstance(chunk, list):
+                chunk.close()
+        if self.folder is not None and self._owner:
+            shutil.rmtree(self.folder, ignore_errors=True)
+        self.folder = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+        return False
@@ -12,12 +12,31 @@ __date__ = "26 Mar. 2015"
 from abc import ABCMeta, abstractmethod
 import copy_reg
 import copy
+import os
+import sys
 import types
+import time
+import importlib
+import shutil
+import tempfile
+import threading
+import traceback
+import Queue
+from collections import deque
+from itertools import izip, count
 from functools import partial
-try:
-    from joblib import Parallel, delayed, cpu_count
-except ImportError:
-    from sklearn.externals.joblib import Parallel, delayed, cpu_count
+
+from .progress import ProgressCounter, ProgressMonitor
+from .affinity import AffinityPlan, placement, _Pinned
+from .retry import (MapResult, MapFailure, TaskTracker, map_chunk_safe,
+                    WORKER_CRASHED, _Tracked)
+from .profiling import Profiled, merge_stats, profile_thread
+from .compression import Compressor, Compressing
+from .storage import ChunkedResults, Spiller
+from .sources import FileSource, RecordArgs, map_file_range
+from .shuffle import combine, combine_chunk, reduce_bucket
+from .memory import MemoryMonitor, _Watched
+from .initialization import new_token, release_state, _Initialized
 
 
 
@@ -25,7 +44,33 @@ def piclking_reduction(m):
     """Adds the capacity to pickle method of objects"""
     return (getattr, (m.__self__, m.__func__.__name__))
 
-copy_reg.pickle(types.MethodType, piclking_reduction)
+
+# Importing joblib is by far the slowest part of importing this package: it
+# is deferred until a parallel computation actually needs it
+_JOBLIB = None
+
+def _joblib():
+    """Return the :lib:`joblib` module, importing it on first use"""
+    global _JOBLIB
+    if _JOBLIB is None:
+        try:
+            import joblib
+            import joblib.pool
+        except ImportError:
+            from sklearn.externals import joblib
+            import sklearn.externals.joblib.pool
+        copy_reg.pickle(types.MethodType, piclking_reduction)
+        _JOBLIB = joblib
+    return _JOBLIB
+
+def delayed(function, check_pickle=True):
+    """Lazy proxy to :func:`joblib.delayed`"""
+    return _joblib().delayed(function, check_pickle)
+
+def cpu_count():
+    """Return the number of CPUs (as :func:`joblib.cpu_count`)"""
+    import multiprocessing
+    return multiprocessing.cpu_count()
 
 
 
@@ -173,6 +218,24 @@ class Mapper(object):
         """Delegate to :meth:`map` method"""
         return self.map(function, seq1, *seqs)
 
+    def map_reduce_by_key(self, function, reducer, seq1, *seqs):
+        """
+        map_reduce_by_key(function, reducer, sequence[, sequence, ...])
+        -> dict
+
+        Apply the function to the items of the argument sequence(s) (as
+        :meth:`map` does). Each call must return an iterable of (key, value)
+        pairs. Return the dict mapping each key to the reduction of its
+        values with the binary function `reducer` (see :func:`reduce`).
+
+        The reducer is expected to be associative and commutative: the
+        order in which the values are reduced is not specified
+        """
+        results = {}
+        for pairs in self.map(function, seq1, *seqs):
+            combine(pairs, reducer, results)
+        return results
+
 class SerialMapper(Mapper):
     """
     ============
@@ -187,7 +250,691 @@ class SerialMapper(Mapper):
         return [function(*tup) for tup in zip(seq1, *seqs)]
 
 
-class StaticParallelMapper(Mapper):
+class RunStats(object):
+    """
+    ========
+    RunStats
+    ========
+    A :class:`RunStats` gathers statistics about the last run of a
+    :class:`ParallelMapper`.
+
+    Attributes
+    ----------
+    n_items : int
+        The number of items processed
+    elapsed : float
+        The wall-clock duration of the run (in seconds)
+    """
+
+    def __init__(self, n_items=0, elapsed=0.):
+        self.n_items = n_items
+        self.elapsed = elapsed
+
+    @property
+    def throughput(self):
+        """The number of items processed per second"""
+        if self.elapsed <= 0:
+            return 0.
+        return self.n_items / self.elapsed
+
+    def __repr__(self):
+        attrs = ", ".join("%s=%r" % (k, v) for k, v
+                          in sorted(self.__dict__.items()))
+        return "RunStats(%s)" % attrs
+
+
+def _map_chunk(function, chunk, counter=None, slot=None):
+    """Apply `function` on each tuple of arguments of `chunk`"""
+    if counter is None:
+        return [function(*args) for args in chunk]
+    results = []
+    for args in chunk:
+        results.append(function(*args))
+        counter.increment(slot)
+    return results
+
+
+def _map_chunk_spilling(function, chunk, counter, slot, folder, name,
+                        threshold):
+    """
+    Apply `function` on each tuple of arguments of `chunk` and store the
+    results on disk, as they are produced, once they are too large (see
+    :class:`Spiller`)
+    """
+    spiller = Spiller(folder, name, threshold, len(chunk))
+    for args in chunk:
+        spiller.append(function(*args))
+        if counter is not None:
+            counter.increment(slot)
+    return spiller.close()
+
+
+def _map_chunk_threaded(function, chunk, n_threads, counter=None, slot=None):
+    """
+    Apply `function` on each tuple of arguments of `chunk` with `n_threads`
+    threads, each pulling the next item as soon as it is done with its
+    previous one. The thread t owns the slot `slot * n_threads + t` of the
+    counter. The first error stops the threads and is re-raised
+    """
+    if n_threads <= 1:
+        return _map_chunk(function, chunk, counter,
+                          None if slot is None else slot * n_threads)
+    results = [None] * len(chunk)
+    indices = iter(xrange(len(chunk)))
+    errors = []
+    lock = threading.Lock()
+
+    def work(thread):
+        thread_slot = None if slot is None else slot * n_threads + thread
+        while True:
+            with lock:
+                index = None if len(errors) > 0 else next(indices, None)
+            if index is None:
+                return
+            try:
+                results[index] = function(*chunk[index])
+            except Exception:
+                with lock:
+                    errors.append(sys.exc_info())
+                return
+            if counter is not None:
+                counter.increment(thread_slot)
+
+    threads = [threading.Thread(target=profile_thread(work), args=(thread,))
+               for thread in xrange(min(n_threads, len(chunk)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if len(errors) > 0:
+        raise errors[0][0], errors[0][1], errors[0][2]
+    return results
+
+
+def _apply_counted(function, counter, *args):
+    """Apply `function` on `args` and increment `counter`"""
+    result = function(*args)
+    counter.increment()
+    return result
+
+
+def _new_pool(n_jobs, backend=None, temp_folder=None):
+    """
+    Build a worker pool the way :lib:`joblib` does. Return None if the
+    work should be carried out sequentially
+    """
+    import multiprocessing
+    from multiprocessing.pool import ThreadPool
+    if n_jobs == 1:
+        return None
+    if backend == "threading":
+        return ThreadPool(n_jobs)
+    if multiprocessing.current_process().daemon:
+        # Daemonic processes cannot have children
+        return None
+    return _joblib().pool.MemmapingPool(n_jobs, temp_folder=temp_folder)
+
+
+class _Run(object):
+    """
+    The parent-side state of a run of a :class:`ParallelMapper`: it must be
+    created before the worker pool is started
+    """
+
+    def __init__(self, mapper, total, n_slots=1):
+        mapper.warm_up()
+        self.mapper = mapper
+        self.total = total
+        self.counter = None
+        if mapper.progress is not None:
+            self.counter = ProgressCounter(n_slots)
+        self.plan = None
+        if mapper.affinity is not None:
+            self.plan = AffinityPlan(placement(mapper.affinity,
+                                               mapper.n_jobs),
+                                     mapper._pin_per_process)
+        # Workers replacing dead ones are tracked as well. Their private
+        # memory is only needed to fit the number of workers to the budget
+        self.memory = MemoryMonitor(2 * mapper.n_jobs,
+                                    mapper.min_available_memory,
+                                    mapper.memory_budget is not None and
+                                    mapper.worker_memory is None)
+        self.profiles = [] if mapper.profile else None
+        self.compressor = None
+        if mapper.compress is not None:
+            self.compressor = Compressor(mapper.compress,
+                                         mapper.compress_threshold)
+        self.monitor = None
+        self.start_time = None
+
+    def wrap(self, function):
+        """Return the function to actually ship to the workers"""
+        if self.plan is not None:
+            function = _Pinned(self.plan, function)
+        return function
+
+    def task(self, task):
+        """
+        Return the worker-level task (the callable the pool runs) to actually
+        ship to the workers. Its outputs must go through :meth:`unwrap`
+        """
+        if self.mapper.initializer is not None:
+            task = _Initialized(task, self.mapper._init_token,
+                                self.mapper.initializer,
+                                self.mapper.initargs)
+        task = _Watched(task, self.memory)
+        if self.profiles is not None:
+            task = Profiled(task)
+        if self.compressor is not None:
+            task = Compressing(task, self.compressor.codec,
+                               self.compressor.threshold)
+        return task
+
+    def pack(self, payload):
+        """Return the `payload` of a task in its shipping form"""
+        if self.compressor is None:
+            return payload
+        return self.compressor.pack(payload)
+
+    def pack_all(self, payloads):
+        """Return the tuple of the shipping forms of the `payloads`"""
+        return tuple(self.pack(payload) for payload in payloads)
+
+    def unwrap(self, output):
+        """Return the output of a task shipped by :meth:`task`"""
+        if self.compressor is not None:
+            output = self.compressor.unpack(output)
+        if self.profiles is not None:
+            output, profile = output
+            self.profiles.append(profile)
+        return output
+
+    def start(self):
+        self.start_time = time.time()
+        if self.counter is not None:
+            self.monitor = ProgressMonitor(self.counter, self.total,
+                                           self.mapper.progress,
+                                           self.mapper.progress_interval)
+            self.monitor.start()
+        return self
+
+    def stop(self, n_items=None):
+        """Release the resources of the run and return its :class:`RunStats`"""
+        if n_items is None:
+            n_items = self.total
+        stats = RunStats(n_items, time.time() - self.start_time)
+        if self.monitor is not None:
+            self.monitor.stop()
+        if self.counter is not None:
+            self.counter.close()
+        if self.plan is not None:
+            stats.placement = self.plan.report()
+            self.plan.close()
+        stats.peak_rss = self.memory.report()
+        stats.peak_memory = self.memory.report_own()
+        if self.memory.min_available is not None:
+            stats.throttled_time = self.memory.throttled_time
+        self.memory.close()
+        self.mapper._fit_memory(stats.peak_memory)
+        if self.mapper.initializer is not None:
+            # The state built in the parent (sequential mode or threading
+            # backend) does not outlive the run either
+            release_state(self.mapper._init_token)
+        if self.profiles is not None:
+            stats.profile = merge_stats(self.profiles,
+                                        self.mapper.profile_file)
+        if self.compressor is not None:
+            stats.raw_bytes = self.compressor.raw_bytes
+            stats.compressed_bytes = self.compressor.compressed_bytes
+            stats.compression_time = self.compressor.elapsed
+        return stats
+
+
+class _Immediate(object):
+    """A result computed synchronously (the AsyncResult interface)"""
+
+    def __init__(self, function, args):
+        self._result = function(*args)
+
+    def ready(self):
+        return True
+
+    def get(self):
+        return self._result
+
+
+def _notify(put, task_id, _):
+    """The callback of a task of :meth:`ParallelMapper._execute_chunks`"""
+    put(task_id)
+
+
+# The time (in seconds) between two checks for the chunks lost with their
+# worker (with the fault tolerance)
+CRASH_CHECK_INTERVAL = 0.1
+
+# The default maximum number of chunks per worker submitted at once (with the
+# fault tolerance)
+MAX_PENDING_PER_WORKER = 16
+
+
+class ParallelMapper(Mapper):
+    """
+    ==============
+    ParallelMapper
+    ==============
+    A :class:`ParallelMapper` is the base class of the :class:`Mapper`
+    computing the mapping in parallel thanks to the :lib:`joblib` library.
+
+    After each call to :meth:`map`, the :attr:`stats` attribute holds the
+    :class:`RunStats` of the run.
+
+    The first sequence given to :meth:`map` can be a :class:`FileSource`:
+    the workers then read and parse their own byte range of the file so that
+    no record crosses the process boundaries.
+
+    Constructor parameters
+    ----------------------
+    n_jobs : int (-1 or >0) (Default : -1)
+        The number of core to use.
+            If >0 : the number of workers
+            If <0 : max(cpu_count() + 1 + n_jobs, 1)
+    verbose : int [0, 50]
+        The verbosity level. The more, the more verbose
+    temp_folder : str, optional
+        Folder to be used by the pool for memmaping large arrays
+        for sharing memory with worker processes. Only active when
+        backend="multiprocessing".
+    backend : str ("multiprocessing" or "threading") or None
+    (default: None --> "multiprocessing")
+        The backend to use
+    progress : callable or None (Default : None)
+        A callback taking a :class:`Progress` instance. If not None, the
+        workers publish their per-item completion count and the callback
+        is called every `progress_interval` seconds (and once at the end)
+    progress_interval : float (>0) (Default : 1.)
+        The time (in seconds) between two calls of the `progress` callback
+    affinity : str ("compact", "scatter" or "numa") or None (Default : None)
+        If not None, each worker is pinned to a core set following the
+        given placement policy (see :func:`placement`). The placement is
+        reported in the :class:`RunStats` as a list of (pid, core set) pairs.
+        Only supported on Linux
+    preload : list of str or None (Default : None)
+        The names of modules to import once, in the parent process, before
+        the first run. The workers being forked from the parent, they start
+        with those modules already imported instead of importing them while
+        processing their first item
+    retries : int (>=0) (Default : 0)
+        The number of times a failed chunk (see :meth:`_execute_chunks`) is
+        resubmitted. Only the failed items of a chunk are resubmitted, unless
+        the worker process died, in which case the whole chunk is. The pool
+        replaces the dead workers
+    keep_failures : bool (Default : False)
+        What to do with the items still failing after all the retries. If
+        True, :meth:`map` returns a :class:`MapResult` whose `failures`
+        attribute reports them. Otherwise a :class:`MapFailure` holding that
+        :class:`MapResult` is raised.
+        With retries=0 and keep_failures=False (the default), the first error
+        aborts the whole map as usual
+    profile : bool (Default : False)
+        Whether to run cProfile inside the workers. The statistics of all the
+        workers are merged into a single :class:`pstats.Stats` available as
+        the `profile` attribute of the :class:`RunStats`. The static mapper
+        profiles whole chunks while the dynamic mapper ships the statistics
+        back with each item
+    profile_file : str or None (Default : None)
+        If not None (and `profile` is True), the merged statistics are also
+        dumped in that file
+    compress : str ("zlib", "bz2" or "lzma") or None (Default : None)
+        If not None, the payloads shipped to the workers (the chunks or the
+        items) and their results are compressed with that codec when their
+        pickle reaches `compress_threshold` bytes. This relieves the pipes
+        when the items or the results are large text blobs or arrays. The
+        :class:`RunStats` then reports the `raw_bytes`, the
+        `compressed_bytes` and the `compression_time` (summed over the
+        parent and the workers). "lzma" requires Python 3 or the
+        backports.lzma package
+    compress_threshold : int (>=0) (Default : 65536)
+        The minimum size (in bytes) of a pickled payload to compress
+    memory_budget : int or None (Default : None)
+        If not None, the memory (in bytes) the workers may use altogether.
+        The number of workers (the `n_jobs` attribute) is then capped to
+        memory_budget // worker_memory (at least one worker)
+    worker_memory : int or None (Default : None)
+        The memory (in bytes) a worker needs. If None, the largest
+        `peak_memory` of the workers of the last run (so that the cap
+        applies from the second run on)
+    min_available_memory : int or None (Default : None)
+        If not None, a worker about to start a chunk (or an item, for the
+        dynamic mapper) waits while the memory available on the machine is
+        below that many bytes and another chunk is being processed. The
+        :class:`RunStats` then reports the `throttled_time` summed over the
+        workers
+    initializer : callable or None (Default : None)
+        If not None, `initializer(*initargs)` is called once in each worker
+        process (the threads of a process share it) before its first task.
+        What it returns, typically a loaded model or an open connection,
+        is available to the mapped function for the lifetime of the worker
+        through :func:`get_worker_state`. The workers only live for a run;
+        likewise, the state built in the parent process (in the sequential
+        mode or with the threading backend) is released at the end of the
+        run
+    initargs : tuple (Default : ())
+        The arguments of the initializer
+
+    Whatever the options, the :class:`RunStats` reports the `peak_rss` of
+    the workers as a list of (pid, peak resident set size in bytes) pairs.
+    The resident set of a worker includes the pages it shares with the
+    parent. The `peak_memory` pairs only count the own memory of each worker
+    (see :class:`MemoryMonitor`)
+    """
+
+    # Whether the workers are processes running several threads, to be
+    # pinned as a whole
+    _pin_per_process = False
+
+    def __init__(self, n_jobs=-1, verbosity=0, temp_folder=None, backend=None,
+                 progress=None, progress_interval=1., affinity=None,
+                 preload=None, retries=0, keep_failures=False, profile=False,
+                 profile_file=None, compress=None, compress_threshold=65536,
+                 memory_budget=None, worker_memory=None,
+                 min_available_memory=None, initializer=None, initargs=()):
+        if n_jobs < 0:
+            n_jobs = max(cpu_count() + 1 + n_jobs, 1)
+        self.n_jobs = self.max_jobs = n_jobs
+        self.backend = backend
+        self.temp_folder = temp_folder
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.affinity = affinity
+        self.preload = [] if preload is None else list(preload)
+        self.retries = retries
+        self.keep_failures = keep_failures
+        self.profile = profile
+        self.profile_file = profile_file
+        self.compress = compress
+        self.compress_threshold = compress_threshold
+        self.memory_budget = memory_budget
+        self.worker_memory = worker_memory
+        self.min_available_memory = min_available_memory
+        self.initializer = initializer
+        self.initargs = tuple(initargs)
+        self._init_token = new_token()
+        self.verbosity = verbosity
+        self.stats = None
+        self._parallelizer_ = None
+        self._warm = False
+        self._fit_memory()
+
+    @property
+    def _parallelizer(self):
+        """The `joblib.Parallel` instance, built on first use"""
+        if self._parallelizer_ is None:
+            Parallel = _joblib().Parallel
+            self._parallelizer_ = Parallel(n_jobs=self.n_jobs,
+                                           verbose=self.verbosity,
+                                           temp_folder=self.temp_folder,
+                                           backend=self.backend)
+        return self._parallelizer_
+
+    def warm_up(self):
+        """
+        Import the `preload` modules and the parallel backend. This is
+        done automatically before the first run
+        """
+        if not self._warm:
+            for name in self.preload:
+                importlib.import_module(name)
+            _joblib()
+            self._warm = True
+
+    def _execute(self, run, tasks):
+        """
+        Carry out the `joblib` tasks of the :class:`_Run`. Set the
+        :attr:`stats` and return the list of results
+        """
+        run.start()
+        try:
+            results = [run.unwrap(output)
+                       for output in self._parallelizer(tasks)]
+        finally:
+            self.stats = run.stop()
+        return results
+
+    def _fit_memory(self, peak_memory=()):
+        """
+        Cap the number of workers so that they fit in the memory budget,
+        given the (pid, peak of its own memory) pairs of the last run
+        """
+        if self.memory_budget is None:
+            return
+        worker_memory = self.worker_memory
+        if worker_memory is None:
+            worker_memory = max([peak for _, peak in peak_memory] or [0])
+        if worker_memory <= 0:
+            return
+        n_jobs = min(self.max_jobs,
+                     max(int(self.memory_budget // worker_memory), 1))
+        if n_jobs != self.n_jobs:
+            self.n_jobs = n_jobs
+            self._parallelizer_ = None
+
+    @property
+    def _fault_tolerant(self):
+        return self.retries > 0 or self.keep_failures
+
+    def _map_file(self, function, source, seqs, nb_ranges):
+        """
+        Map `function` on the records of the :class:`FileSource`, split
+        into `nb_ranges` byte ranges, each read by the worker processing it
+        """
+        if len(seqs) > 0:
+            raise ValueError("A file source cannot be zipped with other "
+                             "sequences")
+        if self._fault_tolerant:
+            raise ValueError("A file source cannot be combined with the "
+                             "fault tolerance")
+        ranges = source.ranges(nb_ranges)
+        # Each range owns a slot of the counter
+        run = _Run(self, None, len(ranges))
+        function = run.wrap(function)
+        tasks = [delayed(run.task(map_file_range))(function, source, start,
+                                                   stop, run.counter, i)
+                 for i, (start, stop) in enumerate(ranges)]
+        results = self._execute(run, tasks)
+        results = [item for sublist in results for item in sublist]
+        self.stats.n_items = len(results)
+        return results
+
+    def map_reduce_by_key(self, function, reducer, seq1, *seqs):
+        """
+        map_reduce_by_key(function, reducer, sequence[, sequence, ...])
+        -> dict
+
+        See :meth:`Mapper.map_reduce_by_key`. Only the per-key results come
+        back to the parent: each worker combines the pairs of its chunk by
+        key and hash-partitions them into one file per worker in a
+        temporary folder (in `temp_folder`, if given). Each worker then
+        reduces the pairs of its own partition. The :class:`RunStats`
+        reports the number of keys (`n_keys`) and the number of bytes
+        shuffled through the files (`shuffled_bytes`).
+
+        The first sequence can be a :class:`FileSource`: each worker then
+        reads the records of its own byte range
+        """
+        if self._fault_tolerant:
+            raise ValueError("The reduction by key cannot be combined with "
+                             "the fault tolerance")
+        if isinstance(seq1, FileSource):
+            if len(seqs) > 0:
+                raise ValueError("A file source cannot be zipped with other "
+                                 "sequences")
+            total = None
+            chunks = [RecordArgs(seq1, start, stop)
+                      for start, stop in seq1.ranges(self.n_jobs)]
+        else:
+            total = len(seq1)
+            chunks = list(Partition(self.n_jobs, total).apply_on(seq1,
+                                                                 *seqs))
+        n_buckets = self.n_jobs
+        run = _Run(self, total, len(chunks))
+        function = run.wrap(function)
+        names = ["chunk%d" % i for i in xrange(len(chunks))]
+        folder = tempfile.mkdtemp(prefix="taskcarrier_", dir=self.temp_folder)
+        results = {}
+        n_items = 0
+        shuffled_bytes = 0
+        run.start()
+        try:
+            if len(chunks) > 0:
+                tasks = [delayed(run.task(combine_chunk))(
+                             function, reducer, run.pack(l), n_buckets,
+                             folder, name, run.counter, i)
+                         for i, (name, l) in enumerate(izip(names, chunks))]
+                for output in self._parallelizer(tasks):
+                    n_items += run.unwrap(output)
+                shuffled_bytes = sum(os.path.getsize(os.path.join(folder,
+                                                                  name))
+                                     for name in os.listdir(folder))
+                tasks = [delayed(run.task(reduce_bucket))(reducer, folder,
+                                                          names, bucket)
+                         for bucket in xrange(n_buckets)]
+                for output in self._parallelizer(tasks):
+                    # The buckets have no key in common
+                    results.update(run.unwrap(output))
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+            self.stats = run.stop(n_items)
+        self.stats.n_keys = len(results)
+        self.stats.shuffled_bytes = shuffled_bytes
+        return results
+
+    def _execute_chunks(self, run, function, chunks, n_chunks=None,
+                        window=None):
+        """
+        Carry out the chunks of the :class:`_Run` with fault tolerance. Set
+        the :attr:`stats` and return the :class:`MapResult`
+
+        Parameters
+        ----------
+        chunks : iterable of pairs (indices, arguments)
+            The chunks to process, pulled as they are submitted. `indices`
+            are the indices of the items in the result and `arguments` the
+            corresponding list of tuples of arguments
+        n_chunks : int or None (Default : None)
+            The number of chunks. If None, len(chunks)
+        window : int (>0) or None (Default : None)
+            The maximum number of chunks submitted to the pool whose
+            outcome has not been processed yet. If None,
+            MAX_PENDING_PER_WORKER * n_jobs
+        """
+        if n_chunks is None:
+            n_chunks = len(chunks)
+        if window is None:
+            window = MAX_PENDING_PER_WORKER * self.n_jobs
+        results = [None] * run.total
+        failures = {}
+        # Each task gives birth to at most one new task per retry
+        tracker = TaskTracker(n_chunks * (self.retries + 1))
+        # The start of a task is recorded before anything which could kill
+        # its worker: the initializer, the throttling, the decompression
+        worker_task = _Tracked(run.task(map_chunk_safe))
+        pool = _new_pool(self.n_jobs, self.backend, self.temp_folder)
+        fresh = iter(chunks)
+        retried = deque()
+        pending = {}
+        task_ids = count()
+        n_resubmitted = 0
+        # The ids of the tasks whose outcome is available
+        completed = Queue.Queue()
+        last_check = time.time()
+        run.start()
+        try:
+            while True:
+                while len(pending) < window:
+                    if len(retried) > 0:
+                        indices, args, attempt = retried.popleft()
+                    else:
+                        chunk = next(fresh, None)
+                        if chunk is None:
+                            break
+                        (indices, args), attempt = chunk, 0
+                    task_id = next(task_ids)
+                    task = (tracker, task_id, function, run.pack(args),
+                            run.counter)
+                    if pool is None:
+                        outcome = _Immediate(worker_task, task)
+                        completed.put(task_id)
+                    else:
+                        notify = partial(_notify, completed.put, task_id)
+                        outcome = pool.apply_async(worker_task, task,
+                                                   callback=notify)
+                    pending[task_id] = (outcome, indices, args, attempt)
+                if len(pending) == 0:
+                    break
+                try:
+                    done = [completed.get(timeout=CRASH_CHECK_INTERVAL)]
+                except Queue.Empty:
+                    done = []
+                while not completed.empty():
+                    done.append(completed.get())
+                lost = set()
+                if time.time() - last_check >= CRASH_CHECK_INTERVAL:
+                    # The callback is not called on the tasks lost with
+                    # their worker nor on those failing in the pool itself
+                    last_check = time.time()
+                    for task_id, entry in pending.items():
+                        if entry[0].ready():
+                            done.append(task_id)
+                        elif tracker.crashed(task_id):
+                            lost.add(task_id)
+                            done.append(task_id)
+                for task_id in done:
+                    if task_id not in pending:
+                        # Already processed
+                        continue
+                    outcome, indices, args, attempt = pending.pop(task_id)
+                    if task_id not in lost:
+                        # The callback is called right before the outcome
+                        # gets ready: get() waits for it
+                        try:
+                            output = run.unwrap(outcome.get())
+                            chunk_results, chunk_failures = output
+                        except Exception:
+                            # E.g. the results could not be pickled
+                            chunk_results = [None] * len(args)
+                            chunk_failures = dict.fromkeys(
+                                range(len(args)), traceback.format_exc())
+                    else:
+                        chunk_results = [None] * len(args)
+                        chunk_failures = dict.fromkeys(range(len(args)),
+                                                       WORKER_CRASHED)
+                    for index, result in izip(indices, chunk_results):
+                        results[index] = result
+                    if len(chunk_failures) == 0:
+                        continue
+                    failed = sorted(chunk_failures)
+                    if attempt < self.retries:
+                        n_resubmitted += 1
+                        retried.append(([indices[i] for i in failed],
+                                        [args[i] for i in failed],
+                                        attempt + 1))
+                    else:
+                        for i in failed:
+                            failures[indices[i]] = chunk_failures[i]
+        finally:
+            if pool is not None:
+                pool.terminate()
+            tracker.close()
+            self.stats = run.stop()
+        self.stats.n_resubmitted = n_resubmitted
+        self.stats.n_failed = len(failures)
+        result = MapResult(results, failures)
+        if len(failures) > 0 and not self.keep_failures:
+            raise MapFailure(result)
+        return result
+
+
+class StaticParallelMapper(ParallelMapper):
     """
     ====================
     StaticParallelMapper
@@ -226,25 +973,94 @@ class StaticParallelMapper(Mapper):
     backend : str ("multiprocessing" or "threading") or None
     (default: None --> "multiprocessing")
         The backend to use
-
-    Refer to joblib for more details
+    progress : callable or None (Default : None)
+        A callback taking a :class:`Progress` instance, called every
+        `progress_interval` seconds. Each worker publishes its completion
+        count after each item
+    progress_interval : float (>0) (Default : 1.)
+        The time (in seconds) between two calls of the `progress` callback
+    affinity : str ("compact", "scatter" or "numa") or None (Default : None)
+        If not None, the placement policy used to pin each worker to a core
+        set (see :func:`placement`). Pinning keeps each worker and the memory
+        of its chunk on the same socket. Only supported on Linux
+    preload : list of str or None (Default : None)
+        The names of modules imported once in the parent before the first
+        run, so that the forked workers start warm
+    chunks_per_worker : int (>0) (Default : 1)
+        The data are splitted into n_jobs * chunks_per_worker chunks. More
+        chunks means smaller pieces of data, which `joblib` dispatches to the
+        workers as they become available
+    spill_threshold : int (>=0) or None (Default : None)
+        If not None, :meth:`map` returns a lazy, indexable
+        :class:`ChunkedResults` instead of a list. The workers store on disk
+        the results of each chunk whose size reaches that many bytes (as a
+        .npy file for numeric results if numpy is available, as a compact
+        pickle store otherwise) and only send back a handle. Random access
+        only loads the requested result. Use `chunks_per_worker` to bound the
+        results a worker holds at once. Cannot be combined with the fault
+        tolerance nor with a :class:`FileSource`
+    spill_folder : str or None (Default : None)
+        The folder where the results are stored (in a sub-folder deleted
+        when the :class:`ChunkedResults` is closed). If None, `temp_folder`
+        or the default system temporary folder
+
+    Refer to :class:`ParallelMapper` for the other parameters and to joblib
+    for more details
     """
 
-    def __init__(self, n_jobs=-1, verbosity=0, temp_folder=None, backend=None):
-        if n_jobs < 0:
-            n_jobs = max(cpu_count() + 1 + n_jobs, 1)
-        self.n_jobs = n_jobs
-        self._parallelizer = Parallel(n_jobs=n_jobs, verbose=verbosity,
-                                      temp_folder=temp_folder, backend=backend)
+    def __init__(self, n_jobs=-1, verbosity=0, temp_folder=None, backend=None,
+                 chunks_per_worker=1, spill_threshold=None, spill_folder=None,
+                 **kwargs):
+        super(StaticParallelMapper, self).__init__(n_jobs, verbosity,
+                                                   temp_folder, backend,
+                                                   **kwargs)
+        self.chunks_per_worker = chunks_per_worker
+        if spill_threshold is not None and self._fault_tolerant:
+            raise ValueError("Spilling the results cannot be combined with "
+                             "the fault tolerance")
+        self.spill_threshold = spill_threshold
+        if spill_folder is None:
+            spill_folder = temp_folder
+        self.spill_folder = spill_folder
 
     def map(self, function, seq1, *seqs):
-        gen = Partition(self.n_jobs, len(seq1)).apply_on(seq1, *seqs)
+        if isinstance(seq1, FileSource):
+            if self.spill_threshold is not None:
+                raise ValueError("Spilling the results cannot be combined "
+                                 "with a file source")
+            return self._map_file(function, seq1, seqs,
+                                  self.n_jobs * self.chunks_per_worker)
+        partition = Partition(self.n_jobs * self.chunks_per_worker,
+                              len(seq1))
+        gen = partition.apply_on(seq1, *seqs)
+        # Each worker owns a slot of the counter: no locking needed
+        run = _Run(self, len(seq1), len(partition))
+        function = run.wrap(function)
+        if self._fault_tolerant:
+            chunks = [(range(sl.start, sl.stop), l)
+                      for sl, l in izip(partition, gen)]
+            return self._execute_chunks(run, function, chunks)
+        if self.spill_threshold is not None:
+            folder = tempfile.mkdtemp(prefix="taskcarrier_",
+                                      dir=self.spill_folder)
+            tasks = [delayed(run.task(_map_chunk_spilling))(
+                         function, run.pack(l), run.counter, i, folder,
+                         "chunk%d" % i, self.spill_threshold)
+                     for i, l in enumerate(gen)]
+            try:
+                chunks = self._execute(run, tasks)
+            except:
+                shutil.rmtree(folder, ignore_errors=True)
+                raise
+            return ChunkedResults(chunks, folder)
         # Since each worker will recieve a list of element to process
         # we need to map the function onto each element
-        func = partial(map, partial(apply, function))
         # Note: a list having a length, it will be more efficient to
         # dispatch
-        results = self._parallelizer([delayed(func)(l) for l in gen])
+        tasks = [delayed(run.task(_map_chunk))(function, run.pack(l),
+                                               run.counter, i)
+                 for i, l in enumerate(gen)]
+        results = self._execute(run, tasks)
         # Flattening the results: (we get back a list (depth 0) of lists (depth
         # 1) where each list of depth 1 contains the results for each worker
         # subset. We need to make a whole iterable of depth 0 containing
@@ -252,7 +1068,83 @@ class StaticParallelMapper(Mapper):
         return [item for sublist in results for item in sublist]
 
 
-class DynamicParallelMapper(Mapper):
+class HybridParallelMapper(ParallelMapper):
+    """
+    ====================
+    HybridParallelMapper
+    ====================
+    A :class:`HybridParallelMapper` compute the mapping with `n_jobs`
+    processes running `n_threads` threads each. It suits functions mixing
+    pure Python code (which the processes run in parallel) with sections
+    releasing the GIL, such as numpy operations or I/O (which the threads of
+    a process overlap), without paying the memory of one process per core.
+
+    Load policy
+    -----------
+    The load is statically splitted among the processes as equally as
+    possible (see :class:`Partition`) and dynamically balanced among the
+    threads of each process: a thread takes the next item of its process's
+    chunk as soon as it is done with the previous one.
+
+    Constructor parameters
+    ----------------------
+    n_jobs : int (-1 or >0) (Default : -1)
+        The number of processes.
+            If >0 : the number of processes
+            If <0 : max(cpu_count() + 1 + n_jobs, 1)
+    verbose : int [0, 50]
+        The verbosity level. The more, the more verbose
+    temp_folder : str, optional
+        Folder to be used by the pool for memmaping large arrays
+        for sharing memory with worker processes
+    backend : str ("multiprocessing" or "threading") or None
+    (default: None --> "multiprocessing")
+        The backend to use
+    n_threads : int (>0) (Default : 2)
+        The number of threads per process
+
+    Refer to :class:`ParallelMapper` for the other parameters. The fault
+    tolerance is not supported. With an `affinity`, all the threads of a
+    process are bound to the core set of the process (which requires the
+    multiprocessing backend).
+    """
+
+    _pin_per_process = True
+
+    def __init__(self, n_jobs=-1, verbosity=0, temp_folder=None, backend=None,
+                 n_threads=2, **kwargs):
+        super(HybridParallelMapper, self).__init__(n_jobs, verbosity,
+                                                   temp_folder, backend,
+                                                   **kwargs)
+        if self._fault_tolerant:
+            raise ValueError("The hybrid mapper cannot be combined with the "
+                             "fault tolerance")
+        if self.affinity is not None and backend == "threading":
+            raise ValueError("The hybrid mapper cannot pin its workers with "
+                             "the threading backend")
+        self.n_threads = n_threads
+
+    def map(self, function, seq1, *seqs):
+        if isinstance(seq1, FileSource):
+            return self._map_file(function, seq1, seqs, self.n_jobs)
+        partition = Partition(self.n_jobs, len(seq1))
+        gen = partition.apply_on(seq1, *seqs)
+        # Each thread of each process owns a slot of the counter
+        run = _Run(self, len(seq1), len(partition) * self.n_threads)
+        function = run.wrap(function)
+        tasks = [delayed(run.task(_map_chunk_threaded))(
+                     function, run.pack(l), self.n_threads, run.counter, i)
+                 for i, l in enumerate(gen)]
+        results = self._execute(run, tasks)
+        return [item for sublist in results for item in sublist]
+
+
+# The number of byte ranges per worker a DynamicParallelMapper splits a
+# FileSource into
+FILE_RANGES_PER_WORKER = 16
+
+
+class DynamicParallelMapper(ParallelMapper):
     """
     =====================
     DynamicParallelMapper
@@ -291,6 +1183,26 @@ class DynamicParallelMapper(Mapper):
     backend : str ("multiprocessing" or "threading") or None
     (default: None --> "multiprocessing")
         The backend to use
+    progress : callable or None (Default : None)
+        A callback taking a :class:`Progress` instance, called every
+        `progress_interval` seconds
+    progress_interval : float (>0) (Default : 1.)
+        The time (in seconds) between two calls of the `progress` callback
+    affinity : str ("compact", "scatter" or "numa") or None (Default : None)
+        If not None, the placement policy used to pin each worker to a core
+        set (see :func:`placement`). Only supported on Linux
+    preload : list of str or None (Default : None)
+        The names of modules imported once in the parent before the first
+        run, so that the forked workers start warm
+    max_in_flight : int (>0) or None (Default : None)
+        If not None, the maximum number of items dispatched to the workers
+        whose result has not been consumed yet. The inputs are then pulled
+        lazily, only as fast as the workers consume them, so that any
+        iterable (even larger than the memory) can be mapped with a flat
+        memory use. See also :meth:`imap`. With the fault tolerance, it
+        bounds the items submitted to the pool at once
+
+    Refer to :class:`ParallelMapper` for the other parameters.
 
     Note
     ----
@@ -299,13 +1211,81 @@ class DynamicParallelMapper(Mapper):
     produce a lot of overhead if the computation time per datum is short
     and there are a lot of data
     """
-    def __init__(self, n_jobs=-1, verbosity=0, temp_folder=None, backend=None):
-        self._parallelizer = Parallel(n_jobs=n_jobs, verbose=verbosity,
-                                      temp_folder=temp_folder, backend=backend)
+
+    def __init__(self, n_jobs=-1, verbosity=0, temp_folder=None, backend=None,
+                 max_in_flight=None, **kwargs):
+        super(DynamicParallelMapper, self).__init__(n_jobs, verbosity,
+                                                    temp_folder, backend,
+                                                    **kwargs)
+        self.max_in_flight = max_in_flight
 
     def map(self, function, seq1, *seqs):
-        return self._parallelizer((delayed(function)(*i)
-            for i in zip(seq1, *seqs)))
+        if isinstance(seq1, FileSource):
+            # Many small ranges, dynamically dispatched
+            return self._map_file(function, seq1, seqs,
+                                  self.n_jobs * FILE_RANGES_PER_WORKER)
+        if self.max_in_flight is not None and not self._fault_tolerant:
+            return list(self.imap(function, seq1, *seqs))
+        run = _Run(self, len(seq1))
+        function = run.wrap(function)
+        if self._fault_tolerant:
+            # Each item is a chunk on its own, pulled as it is submitted
+            chunks = (([i], [args])
+                      for i, args in enumerate(izip(seq1, *seqs)))
+            return self._execute_chunks(run, function, chunks, len(seq1),
+                                        self.max_in_flight)
+        if run.counter is None:
+            tasks = (delayed(run.task(function))(*run.pack_all(i))
+                     for i in zip(seq1, *seqs))
+        else:
+            tasks = (delayed(run.task(_apply_counted))(function, run.counter,
+                                                       *run.pack_all(i))
+                     for i in zip(seq1, *seqs))
+        return self._execute(run, tasks)
+
+    def imap(self, function, seq1, *seqs):
+        """
+        imap(function, iterable[, iterable, ...]) -> generator
+
+        Like :meth:`map` but yield the results lazily, in order. The inputs
+        can be any iterables; they are consumed only as the results are.
+        At most `max_in_flight` (Default : 2 * n_jobs) items are held by
+        the workers or waiting to be yielded at any time.
+        """
+        window = self.max_in_flight
+        if window is None:
+            window = 2 * self.n_jobs
+        total = len(seq1) if hasattr(seq1, "__len__") else None
+        inputs = izip(seq1, *seqs)
+        run = _Run(self, total)
+        function = run.wrap(function)
+        if run.counter is not None:
+            function = partial(_apply_counted, function, run.counter)
+        function = run.task(function)
+        # The pool must be forked after the creation of the run
+        pool = _new_pool(self.n_jobs, self.backend, self.temp_folder)
+        n_items = 0
+        run.start()
+        try:
+            if pool is None:
+                for args in inputs:
+                    n_items += 1
+                    yield run.unwrap(function(*args))
+            else:
+                pending = deque()
+                for args in inputs:
+                    if len(pending) >= window:
+                        n_items += 1
+                        yield run.unwrap(pending.popleft().get())
+                    pending.append(pool.apply_async(function,
+                                                    run.pack_all(args)))
+                while pending:
+                    n_items += 1
+                    yield run.unwrap(pending.popleft().get())
+        finally:
+            if pool is not None:
+                pool.terminate()
+            self.stats = run.stop(n_items)
 
 
 class MapperInstance(object):
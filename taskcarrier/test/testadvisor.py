@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.advisor` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import time
+
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from taskcarrier import *
+
+
+def light(x, y):
+    return x + y
+
+def heavy(x):
+    time.sleep(0.01)
+    return x
+
+
+def test_advise():
+    advice = advise(light, range(20), range(20), n_jobs=2, n_probes=50)
+    assert_equal(advice.n_jobs, 2)
+    assert_true(advice.function_size > 0 and advice.item_size > 0)
+    assert_true(advice.startup_time > 0 and advice.dispatch_time > 0)
+    assert_equal(advice.recommend(1), "serial")
+    assert_true("break-even" in str(advice))
+    assert_raises(ValueError, advise, light, [], [])
+    assert_raises(TypeError, advise, light, [1], [1], n_job=2)
+
+def test_break_even():
+    light_advice = advise(light, range(20), range(20), n_jobs=2,
+                          n_probes=50)
+    heavy_advice = Advice(**dict(light_advice.__dict__, call_time=0.01,
+                                 cpu_fraction=1., n_cores=2))
+    light_even = light_advice.break_even()
+    heavy_even = heavy_advice.break_even()
+    assert_true(heavy_even["static"] is not None)
+    assert_true(heavy_even["static"] <= heavy_even["dynamic"])
+    for name in ("static", "dynamic"):
+        assert_true(light_even[name] is None
+                    or light_even[name] > heavy_even[name])
+        n_items = heavy_even[name]
+        predicted = heavy_advice.predict(n_items)
+        assert_true(predicted[name] < predicted["serial"])
+        predicted = heavy_advice.predict(n_items - 1)
+        assert_true(predicted[name] >= predicted["serial"])
+    assert_true(advise(heavy, range(4), n_jobs=2,
+                       n_probes=50).call_time >= 0.01)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.affinity` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import sys
+import threading
+
+from nose.tools import assert_equal, assert_true, assert_raises
+from nose.plugins.skip import SkipTest
+
+from taskcarrier import *
+from taskcarrier.affinity import AffinityPlan
+
+
+def test_placement_policies():
+    nodes = [[0, 1, 2], [4, 5]]
+    assert_equal(placement("compact", 4, nodes), [(0,), (1,), (2,), (4,)])
+    assert_equal(placement("scatter", 4, nodes), [(0,), (4,), (1,), (5,)])
+    assert_equal(placement("numa", 2, nodes), [(0, 1, 2), (4, 5)])
+    assert_raises(ValueError, placement, "spread", 2, nodes)
+
+def test_numa_nodes_fallback():
+    nodes = numa_nodes("/nonexistent")
+    assert_equal(nodes, [available_cpus()])
+
+def x_plus_y(x, y):
+    return x+y
+
+def test_pinned_mapper():
+    if not sys.platform.startswith("linux"):
+        raise SkipTest("CPU affinity is only supported on Linux")
+    xs = range(20)
+    mapper = StaticParallelMapper(2, affinity="compact")
+    assert_equal(mapper(x_plus_y, xs, xs), [2*x for x in xs])
+    cpus = set(available_cpus())
+    assert_true(len(mapper.stats.placement) >= 1)
+    for pid, core_set in mapper.stats.placement:
+        assert_true(pid != os.getpid())
+        assert_true(set(core_set) <= cpus)
+
+def _pin_threads(plan, n_threads):
+    threads = [threading.Thread(target=plan.pin) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_per_process_plan():
+    if not sys.platform.startswith("linux"):
+        raise SkipTest("CPU affinity is only supported on Linux")
+    from multiprocessing import Process
+    cpus = available_cpus()
+    for per_process, n_pinned in ((True, 1), (False, 2)):
+        plan = AffinityPlan([(cpus[0],)] * 2, per_process)
+        worker = Process(target=_pin_threads, args=(plan, 3))
+        worker.start()
+        worker.join()
+        assert_equal([pid for pid, _ in plan.report()],
+                     [worker.pid] * n_pinned)
+        plan.close()
+
+def test_pinned_hybrid_mapper():
+    if not sys.platform.startswith("linux"):
+        raise SkipTest("CPU affinity is only supported on Linux")
+    xs = range(40)
+    mapper = HybridParallelMapper(2, n_threads=3, affinity="compact")
+    assert_equal(mapper(x_plus_y, xs, xs), [2*x for x in xs])
+    pids = [pid for pid, _ in mapper.stats.placement]
+    assert_true(1 <= len(pids) <= 2)
+    assert_equal(len(set(pids)), len(pids))
+    assert_true(os.getpid() not in pids)
+    assert_raises(ValueError, HybridParallelMapper, 2, backend="threading",
+                  affinity="compact")
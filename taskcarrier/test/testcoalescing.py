@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.coalescing` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import threading
+
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from taskcarrier import *
+
+
+def square(x):
+    return x * x
+
+def inverse(x):
+    return 1. / x
+
+
+def _concurrent_calls(mapper, function, inputs):
+    """Call mapper.map(function, inputs[i]) from one thread per call"""
+    outcomes = [None] * len(inputs)
+    def call(i):
+        try:
+            outcomes[i] = mapper.map(function, inputs[i])
+        except Exception as error:
+            outcomes[i] = error
+    threads = [threading.Thread(target=call, args=(i,))
+               for i in xrange(len(inputs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_coalescing():
+    mapper = CoalescingMapper(DynamicParallelMapper(2), window=0.2)
+    inputs = [range(i, i + 1 + i % 5) for i in xrange(20)]
+    outcomes = _concurrent_calls(mapper, square, inputs)
+    assert_equal(outcomes, [[x * x for x in xs] for xs in inputs])
+    assert_equal(mapper.n_calls, 20)
+    assert_true(mapper.n_batches < 5)
+    assert_equal(mapper.map(square, []), [])
+
+def test_max_items():
+    mapper = CoalescingMapper(SerialMapper(), window=10., max_items=2)
+    outcomes = _concurrent_calls(mapper, square, [[1, 2], [3, 4]])
+    assert_equal(outcomes, [[1, 4], [9, 16]])
+    assert_equal(mapper.n_batches, 2)
+
+def test_errors():
+    mapper = CoalescingMapper(StaticParallelMapper(2), window=0.2)
+    outcomes = _concurrent_calls(mapper, inverse, [[1, 2], [0], [4]])
+    assert_equal(outcomes[0], [1., 0.5])
+    assert_true(isinstance(outcomes[1], ZeroDivisionError))
+    assert_equal(outcomes[2], [0.25])
+    assert_raises(ZeroDivisionError, mapper.map, inverse, [0])
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.compression` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from taskcarrier import *
+from taskcarrier.compression import Compressor
+
+
+def test_threshold():
+    compressor = Compressor("bz2", threshold=100)
+    small = compressor.pack("a")
+    assert_equal(small.codec, None)
+    # The pickle made to measure the size is what is shipped
+    assert_equal(small.size, small.raw_size)
+    assert_true(isinstance(small.payload, bytes))
+    big = compressor.pack("a" * 1000)
+    assert_equal(big.codec, "bz2")
+    assert_true(big.size < big.raw_size)
+    assert_equal(compressor.unpack(big), "a" * 1000)
+    assert_equal(compressor.unpack(small), "a")
+    assert_raises(ValueError, Compressor, "snappy")
+
+def upper(text):
+    return text.upper()
+
+
+def test_compressed_mappers():
+    texts = [("lorem ipsum %d " % i) * 200 for i in range(20)]
+    expected = [text.upper() for text in texts]
+    for mapper in (StaticParallelMapper(2, compress="zlib",
+                                        compress_threshold=1000),
+                   DynamicParallelMapper(2, compress="zlib",
+                                         compress_threshold=1000),
+                   DynamicParallelMapper(2, compress="zlib",
+                                         compress_threshold=1000,
+                                         max_in_flight=3),
+                   StaticParallelMapper(2, compress="zlib",
+                                        compress_threshold=1000,
+                                        keep_failures=True)):
+        assert_equal(mapper(upper, texts), expected)
+        stats = mapper.stats
+        # Both the inputs and the results went through the compressor
+        assert_true(stats.raw_bytes > 2 * sum(len(t) for t in texts))
+        assert_true(stats.compressed_bytes < stats.raw_bytes / 10)
+        assert_true(stats.compression_time > 0)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.graph` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import time
+import threading
+
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from taskcarrier import *
+
+
+def preprocess(n):
+    return range(n)
+
+def scale(data, factor):
+    return [factor * x for x in data]
+
+def total(data):
+    return sum(data)
+
+def merge(*totals):
+    return list(totals)
+
+def nap(duration):
+    time.sleep(duration)
+    return duration
+
+def fail(data):
+    raise ValueError("Broken model")
+
+def new_lock():
+    return threading.Lock()
+
+def die():
+    os._exit(1)
+
+
+def _pipeline():
+    graph = TaskGraph()
+    graph.add("data", preprocess, args=(10,))
+    for factor in (1, 2, 3):
+        graph.add(("scaled", factor), scale, ["data"], args=(factor,))
+        graph.add(("total", factor), total, [("scaled", factor)])
+    graph.add("merge", merge, [("total", factor) for factor in (1, 2, 3)])
+    return graph
+
+def test_fusion():
+    chains = _pipeline().chains(set(["merge"]))
+    assert_equal(len(chains), 5)
+    assert_true([("scaled", 2), ("total", 2)] in chains)
+    chains = _pipeline().chains(set([("scaled", 2), "merge"]))
+    assert_true([("scaled", 2)] in chains)
+
+def test_pipeline():
+    for mapper in (SerialMapper(), DynamicParallelMapper(2),
+                   StaticParallelMapper(2, backend="threading")):
+        assert_equal(_pipeline().run(mapper), {"merge": [45, 90, 135]})
+    results = _pipeline().run(DynamicParallelMapper(2),
+                              outputs=["data", ("total", 3)])
+    assert_equal(results, {"data": range(10), ("total", 3): 135})
+
+def test_no_barrier():
+    graph = TaskGraph()
+    graph.add("slow", nap, args=(0.4,))
+    graph.add("fast", nap, args=(0.1,))
+    graph.add("after_fast", nap, ["fast"])
+    start = time.time()
+    graph.run(DynamicParallelMapper(2))
+    # "after_fast" starts as soon as "fast" is done
+    assert_true(time.time() - start < 0.6)
+
+def test_failure():
+    graph = _pipeline()
+    graph.add("broken", fail, ["data"])
+    assert_raises(TaskFailure, graph.run, DynamicParallelMapper(2))
+    assert_raises(ValueError, graph.add, "merge", merge)
+    assert_raises(ValueError, graph.add, "other", merge, ["unknown"])
+
+def test_pool_failures():
+    graph = TaskGraph()
+    graph.add("data", preprocess, args=(10,))
+    graph.add("sum", lambda data: sum(data), ["data"])
+    assert_raises(TaskFailure, graph.run, DynamicParallelMapper(2))
+    assert_equal(graph.run(SerialMapper()), {"sum": 45})
+    graph = TaskGraph()
+    graph.add("lock", new_lock)
+    assert_raises(TaskFailure, graph.run, DynamicParallelMapper(2))
+
+def test_worker_crash():
+    graph = TaskGraph()
+    graph.add("data", preprocess, args=(10,))
+    graph.add("crash", die)
+    graph.add("merge", merge, ["data", "crash"])
+    try:
+        graph.run(DynamicParallelMapper(2))
+    except TaskFailure as error:
+        assert_equal(error.name, "crash")
+    else:
+        raise AssertionError("TaskFailure expected")
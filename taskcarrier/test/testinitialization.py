@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.initialization` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import random
+import tempfile
+from collections import defaultdict
+
+from nose.tools import assert_equal, assert_true
+
+from taskcarrier import *
+
+
+def load_model(scale):
+    # A random tag identifies each initialization
+    return {"pid": os.getpid(), "tag": random.random(), "scale": scale}
+
+def predict(x):
+    model = get_worker_state()
+    return os.getpid(), model["pid"], model["tag"], model["scale"] * x
+
+def die_once(path):
+    # The marker file survives the worker
+    marker = os.path.join(path, "died")
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return {}
+
+
+def _check(results, expected):
+    assert_equal([result[3] for result in results], expected)
+    tags = defaultdict(set)
+    for pid, model_pid, tag, _ in results:
+        assert_equal(pid, model_pid)
+        tags[pid].add(tag)
+    # Once per process
+    assert_true(all(len(pid_tags) == 1 for pid_tags in tags.values()))
+    return tags
+
+def test_initializer():
+    xs = range(40)
+    expected = [3 * x for x in xs]
+    for mapper in (StaticParallelMapper(2, chunks_per_worker=4,
+                                        initializer=load_model,
+                                        initargs=(3,)),
+                   DynamicParallelMapper(2, initializer=load_model,
+                                         initargs=(3,)),
+                   HybridParallelMapper(2, n_threads=3,
+                                        initializer=load_model,
+                                        initargs=(3,))):
+        tags = _check(mapper(predict, xs), expected)
+        assert_true(os.getpid() not in tags)
+    assert_equal(get_worker_state(), None)
+
+def test_sequential():
+    from taskcarrier.initialization import _STATES
+    for mapper in (DynamicParallelMapper(1, initializer=load_model,
+                                         initargs=(2,)),
+                   StaticParallelMapper(2, backend="threading",
+                                        initializer=load_model,
+                                        initargs=(2,))):
+        first = _check(mapper(predict, [1, 2]), [2, 4])
+        # The state of the parent does not outlive the run
+        assert_true(all(key[0] != mapper._init_token for key in _STATES))
+        assert_equal(get_worker_state(), None)
+        second = _check(mapper(predict, [3]), [6])
+        assert_true(first[os.getpid()] != second[os.getpid()])
+
+def test_initializer_crash():
+    # The chunk lost with the worker dying in the initializer is retried
+    mapper = StaticParallelMapper(2, retries=1, initializer=die_once,
+                                  initargs=(tempfile.mkdtemp(),))
+    assert_equal(mapper(abs, range(-4, 0)), [4, 3, 2, 1])
+    assert_equal(mapper.stats.n_resubmitted, 1)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.memory` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import time
+import cPickle as pickle
+import tempfile
+
+from nose.tools import assert_equal, assert_true
+
+from taskcarrier import *
+from taskcarrier.memory import available_memory, MemoryMonitor
+
+
+MB = 1024 * 1024
+
+def allocate(n_mb):
+    block = " " * (n_mb * MB)
+    return len(block)
+
+def nap(duration):
+    time.sleep(duration)
+    return duration
+
+
+def test_available_memory():
+    path = tempfile.mktemp()
+    try:
+        with open(path, "w") as hdl:
+            hdl.write("MemTotal: 100 kB\nMemFree: 10 kB\n"
+                      "MemAvailable: 50 kB\nBuffers: 1 kB\nCached: 2 kB\n")
+        assert_equal(available_memory(path), 50 * 1024)
+        with open(path, "w") as hdl:
+            hdl.write("MemTotal: 100 kB\nMemFree: 10 kB\n"
+                      "Buffers: 1 kB\nCached: 2 kB\n")
+        assert_equal(available_memory(path), 13 * 1024)
+    finally:
+        os.remove(path)
+    assert_equal(available_memory(path), None)
+
+def test_peak_rss():
+    mapper = StaticParallelMapper(2)
+    assert_equal(mapper(allocate, [40, 1]), [40 * MB, MB])
+    peaks = dict(mapper.stats.peak_rss)
+    assert_equal(len(peaks), 2)
+    assert_true(os.getpid() not in peaks)
+    assert_true(max(peaks.values()) >= 40 * MB)
+    # Freed before the end of the task, but still the peak of the worker
+    # (the kernel counters lag behind by a few pages)
+    assert_true(max(dict(mapper.stats.peak_memory).values()) >= 39 * MB)
+
+def test_shared_pages_not_counted():
+    # The workers share the pages of a large parent
+    ballast = bytearray(200 * MB)
+    mapper = StaticParallelMapper(2, memory_budget=300 * MB)
+    mapper(abs, range(-4, 0))
+    assert_true(min(peak for _, peak in mapper.stats.peak_rss) >= 200 * MB)
+    assert_true(max(peak for _, peak in mapper.stats.peak_memory) < 100 * MB)
+    assert_equal(mapper.n_jobs, 2)
+    del ballast
+
+def test_memory_budget():
+    mapper = StaticParallelMapper(4, memory_budget=10 * MB,
+                                  worker_memory=4 * MB)
+    assert_equal(mapper.n_jobs, 2)
+    assert_equal(mapper(abs, range(-5, 0)), range(5, 0, -1))
+    assert_equal(mapper.n_jobs, 2)
+    # Measured: the first run reveals the workers do not fit
+    mapper = DynamicParallelMapper(3, memory_budget=MB)
+    assert_equal(mapper.n_jobs, 3)
+    mapper(abs, range(6))
+    assert_equal(mapper.n_jobs, 1)
+    assert_equal(mapper.max_jobs, 3)
+
+def test_throttling():
+    # Never enough memory: the workers run one chunk at a time
+    mapper = DynamicParallelMapper(2, min_available_memory=2 ** 62)
+    start = time.time()
+    assert_equal(mapper(nap, [0.1] * 4), [0.1] * 4)
+    assert_true(time.time() - start >= 0.35)
+    assert_true(mapper.stats.throttled_time > 0)
+    monitor = MemoryMonitor(1)
+    monitor.enter()
+    monitor.exit()
+    assert_equal(monitor.report()[0][0], os.getpid())
+    assert_equal(monitor.throttled_time, 0.)
+    monitor.close()
+
+def test_monitor_pickling():
+    # Only the key is shipped: the process finds back its monitor
+    monitor = MemoryMonitor(1)
+    assert_true(pickle.loads(pickle.dumps(monitor, 2)) is monitor)
+    monitor.close()
+    unknown = pickle.loads(pickle.dumps(monitor, 2))
+    unknown.enter()
+    unknown.exit()
+    assert_equal(unknown.report(), [])
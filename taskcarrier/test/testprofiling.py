@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.profiling` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import pstats
+import tempfile
+
+from nose.tools import assert_equal, assert_true
+
+from taskcarrier import *
+
+
+def inner_hot_spot(x):
+    return sum(range(x))
+
+def task(x):
+    return inner_hot_spot(x)
+
+
+def _n_calls(stats, name):
+    return sum(value[1] for key, value in stats.stats.items()
+               if key[2] == name)
+
+def test_profiled_workers():
+    xs = range(40)
+    expected = [sum(range(x)) for x in xs]
+    for mapper in (StaticParallelMapper(2, profile=True),
+                   DynamicParallelMapper(2, profile=True),
+                   DynamicParallelMapper(2, profile=True, max_in_flight=4),
+                   StaticParallelMapper(2, profile=True, retries=1)):
+        assert_equal(mapper(task, xs), expected)
+        assert_equal(_n_calls(mapper.stats.profile, "inner_hot_spot"), 40)
+
+def test_profiled_threads():
+    # The items are run by the threads of the workers, not their main thread
+    mapper = HybridParallelMapper(2, n_threads=3, profile=True)
+    assert_equal(mapper(task, range(40)), [sum(range(x)) for x in range(40)])
+    assert_equal(_n_calls(mapper.stats.profile, "inner_hot_spot"), 40)
+
+def test_profile_file():
+    path = os.path.join(tempfile.mkdtemp(), "map.prof")
+    mapper = StaticParallelMapper(2, profile=True, profile_file=path)
+    mapper(task, range(10))
+    assert_equal(_n_calls(pstats.Stats(path), "inner_hot_spot"), 10)
+
+def test_no_profile():
+    mapper = StaticParallelMapper(2)
+    mapper(task, range(10))
+    assert_true(not hasattr(mapper.stats, "profile"))
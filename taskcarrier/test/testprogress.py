@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.progress` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+from nose.tools import assert_equal, assert_true
+
+from taskcarrier import *
+
+
+def test_progress_counter():
+    counter = ProgressCounter(3)
+    counter.increment(0)
+    counter.increment(2, 5)
+    counter.increment()
+    assert_equal(counter.value, 7)
+    counter.close()
+
+def test_progress_eta():
+    progress = Progress(25, 100, 5.)
+    assert_equal(progress.rate, 5.)
+    assert_equal(progress.eta, 15.)
+    assert_equal(Progress(3, None, 1.).eta, None)
+    assert_equal(Progress(0, 10, 0.).eta, None)
+
+def x_plus_y(x, y):
+    return x+y
+
+def _check_progress(mapper_cls):
+    reports = []
+    mapper = mapper_cls(2, progress=reports.append, progress_interval=0.01)
+    xs = range(100)
+    res = mapper(x_plus_y, xs, xs)
+    assert_equal(res, [2*x for x in xs])
+    assert_true(len(reports) >= 1)
+    last = reports[-1]
+    assert_equal(last.done, 100)
+    assert_equal(last.total, 100)
+    assert_equal(last.eta, 0.)
+    assert_equal(mapper.stats.n_items, 100)
+
+def test_static_progress():
+    _check_progress(StaticParallelMapper)
+
+def test_dynamic_progress():
+    _check_progress(DynamicParallelMapper)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.retry` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import time
+import tempfile
+import threading
+
+from nose.tools import assert_equal, assert_true
+
+from taskcarrier import *
+
+
+def fail_on_odd(x):
+    if x % 2 == 1:
+        raise ValueError("Odd")
+    return x
+
+def fail_once(path, x):
+    # Fails the first time the item is seen (the marker file survives
+    # the worker)
+    marker = os.path.join(path, str(x))
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        raise IOError("Transient")
+    return x
+
+def crash_once(path, x):
+    marker = os.path.join(path, str(x))
+    if x == 3 and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return x
+
+class Concurrency(object):
+    """Records the maximum number of concurrent calls (threading backend)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, x):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return fail_on_odd(x)
+
+
+def test_keep_failures():
+    for mapper_cls in (StaticParallelMapper, DynamicParallelMapper):
+        mapper = mapper_cls(2, keep_failures=True)
+        res = mapper(fail_on_odd, range(10))
+        assert_equal(res, [0, None, 2, None, 4, None, 6, None, 8, None])
+        assert_equal(res.failed_indices, [1, 3, 5, 7, 9])
+        assert_true("Odd" in res.failures[1])
+
+def test_map_failure():
+    mapper = StaticParallelMapper(2, retries=2)
+    try:
+        mapper(fail_on_odd, range(4))
+    except MapFailure as error:
+        assert_equal(error.result, [0, None, 2, None])
+        assert_equal(mapper.stats.n_resubmitted, 4)
+    else:
+        raise AssertionError("MapFailure expected")
+
+def test_transient_failures():
+    for mapper_cls in (StaticParallelMapper, DynamicParallelMapper):
+        path = tempfile.mkdtemp()
+        mapper = mapper_cls(2, retries=1)
+        xs = range(6)
+        res = mapper(fail_once, [path]*len(xs), xs)
+        assert_equal(res, xs)
+        assert_equal(res.failures, {})
+
+def test_crashed_worker():
+    path = tempfile.mkdtemp()
+    mapper = StaticParallelMapper(2, retries=1)
+    xs = range(8)
+    assert_equal(mapper(crash_once, [path]*len(xs), xs), xs)
+    assert_equal(mapper.stats.n_resubmitted, 1)
+
+def test_max_in_flight():
+    concurrency = Concurrency()
+    mapper = DynamicParallelMapper(4, backend="threading", max_in_flight=2,
+                                   keep_failures=True)
+    res = mapper(concurrency, range(20))
+    assert_equal(res.failed_indices, range(1, 20, 2))
+    assert_true(concurrency.max_running <= 2)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.scheduling` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import time
+import threading
+
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from taskcarrier import *
+
+
+def nap(duration):
+    time.sleep(duration)
+    return duration
+
+def inverse(x):
+    return 1. / x
+
+def die(x):
+    os._exit(1)
+
+_ORDER = []
+_GATE = threading.Event()
+
+def gate(x):
+    _GATE.wait(10)
+    return x
+
+def record(tag):
+    _ORDER.append(tag)
+    return tag
+
+
+def test_map():
+    with FairScheduler(DynamicParallelMapper(2)) as scheduler:
+        assert_equal(scheduler.map(pow, range(10), [2] * 10),
+                     [x ** 2 for x in range(10)])
+        assert_equal(scheduler.map(pow, [], []), [])
+        mapper = scheduler.mapper_for(priority=1, tenant="me")
+        assert_equal(mapper(abs, [-1, -2, 3]), [1, 2, 3])
+        assert_equal(mapper.stats.n_items, 3)
+        assert_raises(ZeroDivisionError, scheduler.map, inverse, [1, 0])
+    assert_raises(ValueError, scheduler.map, abs, [1])
+
+def test_low_latency():
+    with FairScheduler(DynamicParallelMapper(2)) as scheduler:
+        batch = scheduler.submit(nap, [0.05] * 40, tenant="batch")
+        time.sleep(0.1)
+        start = time.time()
+        assert_equal(scheduler.map(nap, [0.05] * 2, priority=1), [0.05] * 2)
+        # Does not wait for the 1s batch
+        assert_true(time.time() - start < 0.5)
+        assert_true(not batch.ready())
+        assert_equal(batch.get(), [0.05] * 40)
+
+def test_fair_share():
+    del _ORDER[:]
+    _GATE.clear()
+    with FairScheduler(SerialMapper(), weights={"a": 3}) as scheduler:
+        # Keep the worker busy while the other jobs are submitted
+        first = scheduler.submit(gate, [0])
+        a = scheduler.submit(record, ["a"] * 12, tenant="a")
+        b = scheduler.submit(record, ["b"] * 12, tenant="b")
+        urgent = scheduler.submit(record, ["urgent"] * 2, priority=1)
+        _GATE.set()
+        for job in (first, a, b, urgent):
+            job.get()
+    assert_equal(_ORDER[:2], ["urgent"] * 2)
+    assert_equal(_ORDER[2:10].count("a"), 6)
+    assert_true(urgent.stats.wait_time > 0)
+
+def test_worker_crash():
+    with FairScheduler(DynamicParallelMapper(2)) as scheduler:
+        assert_raises(RuntimeError, scheduler.map, die, range(4))
+        # The pool replaced the workers
+        assert_equal(scheduler.map(abs, [-1, -2, 3]), [1, 2, 3])
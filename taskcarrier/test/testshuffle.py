@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.shuffle` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import shutil
+import tempfile
+from operator import add
+from collections import Counter
+
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from taskcarrier import *
+
+
+LINES = ["the quick brown fox", "jumps over the lazy dog", "the end"] * 20
+
+def word_counts(line):
+    return [(word, 1) for word in line.split()]
+
+
+def test_map_reduce_by_key():
+    expected = dict(Counter(" ".join(LINES).split()))
+    folder = tempfile.mkdtemp()
+    try:
+        for mapper in (SerialMapper(), StaticParallelMapper(2),
+                       DynamicParallelMapper(3, temp_folder=folder),
+                       StaticParallelMapper(2, backend="threading")):
+            assert_equal(mapper.map_reduce_by_key(word_counts, add, LINES),
+                         expected)
+        assert_equal(os.listdir(folder), [])
+    finally:
+        shutil.rmtree(folder)
+
+def test_stats():
+    mapper = StaticParallelMapper(2)
+    assert_equal(mapper.map_reduce_by_key(word_counts, add, []), {})
+    results = mapper.map_reduce_by_key(word_counts, max, LINES)
+    assert_equal(mapper.stats.n_items, len(LINES))
+    assert_equal(mapper.stats.n_keys, len(results))
+    assert_true(mapper.stats.shuffled_bytes > 0)
+    assert_raises(ValueError, StaticParallelMapper(2, retries=1)
+                  .map_reduce_by_key, word_counts, add, LINES)
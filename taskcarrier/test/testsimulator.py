@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.simulator` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import time
+
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from taskcarrier import *
+
+
+def nap(duration):
+    time.sleep(duration)
+    return duration
+
+
+def test_simulate():
+    durations = [1.] * 8
+    serial = simulate(durations, "serial", n_jobs=4)
+    assert_equal((serial.n_jobs, serial.makespan, serial.utilization),
+                 (1, 8., 1.))
+    static = simulate(durations, "static", 4, dispatch=0.1, startup=1.)
+    assert_equal(static.n_tasks, 4)
+    assert_true(abs(static.makespan - 3.4) < 1e-9)
+    chunked = simulate(durations, "chunked", 2, chunk_size=3)
+    assert_equal((chunked.n_tasks, chunked.makespan), (3, 5.))
+    # The parent cannot dispatch tiny items fast enough
+    tiny = [0.001] * 1000
+    assert_true(simulate(tiny, "dynamic", 4, dispatch=0.001).makespan >
+                simulate(tiny, "static", 4, dispatch=0.001).makespan)
+    assert_raises(ValueError, simulate, durations, "chunked", 2)
+    assert_raises(ValueError, simulate, durations, "random", 2)
+
+def test_compare():
+    biased = [0.01 * i for i in xrange(100)]
+    simulations = compare(biased, [2, 4], dispatch=0.001,
+                          chunks_per_worker_values=(1, 4), chunk_sizes=(5,))
+    assert_equal(len(simulations), 1 + 2 * 4)
+    makespans = [simulation.makespan for simulation in simulations]
+    assert_equal(makespans, sorted(makespans))
+    assert_equal(simulations[-1].policy, "serial")
+    # The cost of the items grows: a single chunk per worker is unbalanced
+    assert_equal(simulations[0].n_jobs, 4)
+    assert_true(simulations[0].options != {"chunks_per_worker": 1})
+
+def test_against_real_runs():
+    results, durations = record_durations(SerialMapper(), nap,
+                                          [0.2, 0.2] + [0.02] * 10)
+    assert_equal(results, [0.2, 0.2] + [0.02] * 10)
+    assert_true(min(durations) >= 0.02)
+    advice = advise(nap, [0.], n_jobs=2, n_probes=50)
+    for policy, mapper in (("static", StaticParallelMapper(2)),
+                           ("dynamic", DynamicParallelMapper(2))):
+        mapper(nap, results)
+        predicted = simulate(durations, policy, 2, advice.dispatch_time,
+                             advice.startup_time).makespan
+        # Stopping the pool takes up to 0.1s
+        assert_true(abs(predicted - mapper.stats.elapsed) < 0.15)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.sources` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import tempfile
+from operator import add
+
+from nose.tools import assert_equal, assert_raises
+
+from taskcarrier import *
+
+
+def _write(content):
+    fd, path = tempfile.mkstemp()
+    with os.fdopen(fd, "w") as hdl:
+        hdl.write(content)
+    return path
+
+def parse(record):
+    return int(record.split(",")[1])
+
+def parse_pair(record):
+    key, value = record.split(",")
+    return [(int(key) % 3, int(value))]
+
+
+def test_ranges_cover_all_records():
+    records = ["%d,%d" % (i, i * i) for i in range(97)]
+    for delimiter in ("\n", "\r\n"):
+        source = FileSource(_write(delimiter.join(records) + delimiter),
+                            delimiter)
+        for nb_parts in (1, 2, 3, 7, 50, 1000):
+            read = [record for start, stop in source.ranges(nb_parts)
+                    for record in source.read_range(start, stop)]
+            assert_equal(read, records)
+
+def test_no_trailing_delimiter_and_empty_records():
+    source = FileSource(_write("a\n\nbb\nccc"))
+    assert_equal(list(source), ["a", "", "bb", "ccc"])
+    assert_equal(FileSource(_write("")).ranges(4), [])
+
+def test_mappers_on_file():
+    path = _write("".join("%d,%d\n" % (i, 3 * i) for i in range(200)))
+    expected = [3 * i for i in range(200)]
+    for mapper in (StaticParallelMapper(2), DynamicParallelMapper(2),
+                   SerialMapper()):
+        assert_equal(mapper(parse, FileSource(path)), expected)
+    mapper = StaticParallelMapper(2)
+    mapper(parse, FileSource(path))
+    assert_equal(mapper.stats.n_items, 200)
+    assert_raises(ValueError, mapper, parse, FileSource(path), range(200))
+
+def test_map_reduce_by_key_on_file():
+    path = _write("".join("%d,%d\n" % (i, 3 * i) for i in range(200)))
+    expected = {}
+    for i in range(200):
+        expected[i % 3] = expected.get(i % 3, 0) + 3 * i
+    for mapper in (StaticParallelMapper(2), SerialMapper()):
+        assert_equal(mapper.map_reduce_by_key(parse_pair, add,
+                                              FileSource(path)), expected)
+    assert_equal(StaticParallelMapper(2).map_reduce_by_key(
+        parse_pair, add, FileSource(_write(""))), {})
+    mapper = DynamicParallelMapper(2)
+    mapper.map_reduce_by_key(parse_pair, add, FileSource(path))
+    assert_equal(mapper.stats.n_items, 200)
+
+def test_unsupported_combinations():
+    path = _write("1,2\n3,4\n")
+    assert_raises(ValueError, StaticParallelMapper(2, spill_threshold=0),
+                  parse, FileSource(path))
+    assert_raises(ValueError, AdaptiveParallelMapper(store=None), parse,
+                  FileSource(path))
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.storage` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import tempfile
+
+from nose.tools import assert_equal, assert_true, assert_raises
+from nose.plugins.skip import SkipTest
+
+from taskcarrier import *
+from taskcarrier.storage import NpyChunk, PickleChunk, Spiller
+
+
+def to_text(x):
+    return str(x) * 10
+
+def square(x):
+    return x * x
+
+def half_or_int(x):
+    return x / 2. if x % 3 == 0 else x
+
+def int_or_bool(x):
+    return x % 2 == 0 if x % 5 == 0 else x
+
+
+def test_pickle_spill():
+    folder = tempfile.mkdtemp()
+    mapper = StaticParallelMapper(2, chunks_per_worker=2, spill_threshold=0,
+                                  spill_folder=folder)
+    xs = range(50)
+    res = mapper(to_text, xs)
+    assert_true(isinstance(res, ChunkedResults))
+    assert_equal(res.n_spilled, 4)
+    assert_true(all(isinstance(c, PickleChunk) for c in res.chunks))
+    assert_equal(len(res), 50)
+    assert_equal(res[37], to_text(37))
+    assert_equal(res[-1], to_text(49))
+    assert_equal(res[10:13], [to_text(x) for x in range(10, 13)])
+    assert_equal(list(res), [to_text(x) for x in xs])
+    assert_raises(IndexError, res.__getitem__, 50)
+    spilled = res.folder
+    assert_true(os.path.dirname(spilled) == folder)
+    res.close()
+    assert_true(not os.path.exists(spilled))
+
+def test_no_spill_below_threshold():
+    mapper = StaticParallelMapper(2, spill_threshold=1 << 20)
+    with mapper(to_text, range(10)) as res:
+        assert_equal(res.n_spilled, 0)
+        assert_equal(list(res), [to_text(x) for x in range(10)])
+
+def test_npy_spill():
+    try:
+        import numpy
+    except ImportError:
+        raise SkipTest("numpy is not available")
+    mapper = StaticParallelMapper(2, spill_threshold=0)
+    with mapper(square, range(30)) as res:
+        assert_true(all(isinstance(c, NpyChunk) for c in res.chunks))
+        assert_equal(res[29], 29 * 29)
+        assert_equal(list(res), [x * x for x in range(30)])
+        assert_true(all(type(r) is int for r in res))
+
+def test_mixed_types():
+    mapper = StaticParallelMapper(2, spill_threshold=0)
+    for function in (half_or_int, int_or_bool):
+        xs = range(30)
+        with mapper(function, xs) as res:
+            assert_true(all(isinstance(c, PickleChunk) for c in res.chunks))
+            assert_equal([(r, type(r)) for r in res],
+                         [(function(x), type(function(x))) for x in xs])
+
+def test_incremental_spill():
+    folder = tempfile.mkdtemp()
+    spiller = Spiller(folder, "chunk", 100, 20)
+    spiller.append("a")
+    assert_equal(os.listdir(folder), [])
+    # The results are written as soon as they reach the threshold
+    spiller.append("b" * 200)
+    assert_equal(os.listdir(folder), ["chunk.pkl"])
+    for i in range(18):
+        spiller.append(to_text(i))
+    chunk = spiller.close()
+    assert_true(isinstance(chunk, PickleChunk))
+    assert_equal([chunk[i] for i in range(20)],
+                 ["a", "b" * 200] + [to_text(i) for i in range(18)])
+
+def test_npy_fallback():
+    try:
+        import numpy as np
+    except ImportError:
+        raise SkipTest("numpy is not available")
+    # Arrays already written to a .npy file, then a result of another type
+    results = [np.arange(3.) * i for i in range(5)] + ["a"]
+    folder = tempfile.mkdtemp()
+    spiller = Spiller(folder, "chunk", 0, len(results))
+    for result in results:
+        spiller.append(result)
+    chunk = spiller.close()
+    assert_true(isinstance(chunk, PickleChunk))
+    assert_equal(os.listdir(folder), ["chunk.pkl"])
+    for i in range(5):
+        assert_true(type(chunk[i]) is np.ndarray)
+        assert_equal(list(chunk[i]), list(results[i]))
+    assert_equal(chunk[5], "a")
+
+def test_spill_and_fault_tolerance():
+    assert_raises(ValueError, StaticParallelMapper, 2, spill_threshold=0,
+                  retries=1)
@@ -8,7 +8,11 @@ __copyright__ = "3-clause BSD License"
 __version__ = '1.0'
 __date__ = "26 Mar. 2015"
 
-from nose.tools import assert_equal
+import sys
+import subprocess
+import time
+
+from nose.tools import assert_equal, assert_true, assert_raises
 
 from taskcarrier import *
 
@@ -84,3 +88,54 @@ def test_zerolength():
 
 
 
+def test_dynamic_max_in_flight():
+    pulled = []
+    def source(n):
+        for i in xrange(n):
+            pulled.append(i)
+            yield i
+    mapper = DynamicParallelMapper(2, max_in_flight=3)
+    for consumed, res in enumerate(mapper.imap(abs, source(50)), 1):
+        assert_equal(res, consumed - 1)
+        assert_true(len(pulled) - consumed <= 3)
+    assert_equal(mapper.stats.n_items, 50)
+    xs = range(100)
+    assert_equal(mapper(x_plus_y, xs, xs), [2*x for x in xs])
+
+
+def test_lazy_import():
+    snippet = ("import sys, taskcarrier; "
+               "sys.exit('joblib' in sys.modules or 'numpy' in sys.modules)")
+    assert_equal(subprocess.call([sys.executable, "-c", snippet]), 0)
+
+def test_preload():
+    mapper = StaticParallelMapper(2, preload=["colorsys"])
+    sys.modules.pop("colorsys", None)
+    assert_equal(mapper(abs, [-1, -2]), [1, 2])
+    assert_true("colorsys" in sys.modules)
+
+
+
+def test_static_chunks_per_worker():
+    xs = range(50)
+    mapper = StaticParallelMapper(2, chunks_per_worker=4)
+    assert_equal(mapper(x_plus_y, xs, xs), [2*x for x in xs])
+
+
+
+
+
+def nap(duration):
+    time.sleep(duration)
+    return duration
+
+def test_hybrid_para_mapper():
+    xs = range(50)
+    mapper = HybridParallelMapper(2, n_threads=3)
+    assert_equal(mapper(x_plus_y, xs, xs), [2*x for x in xs])
+    assert_equal(mapper(abs, []), [])
+    # The threads of each process overlap the GIL-releasing sleeps
+    start = time.time()
+    assert_equal(mapper(nap, [0.1] * 12), [0.1] * 12)
+    assert_true(time.time() - start < 0.5)
+    assert_raises(ZeroDivisionError, mapper, divmod, [1, 1], [1, 0])
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+tests of the :mod:`taskcarrier.tuning` module
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__version__ = '1.0'
+__date__ = "19 Oct. 2026"
+
+import os
+import tempfile
+
+from nose.tools import assert_equal, assert_true
+
+from taskcarrier import *
+from taskcarrier.tuning import function_key, size_bucket
+
+
+def x_plus_y(x, y):
+    return x+y
+
+
+def test_exploration_then_exploitation():
+    candidates = [(1, 1), (2, 1), (2, 4)]
+    mapper = AdaptiveParallelMapper(candidates, store=None,
+                                    explore_every=None)
+    xs = range(100)
+    used = []
+    for _ in range(4):
+        assert_equal(mapper(x_plus_y, xs, xs), [2*x for x in xs])
+        used.append(mapper.stats.config)
+    assert_equal(used[:3], candidates)
+    assert_equal(used[3], mapper.best_config(x_plus_y, len(xs)))
+
+def test_persistence():
+    path = os.path.join(tempfile.mkdtemp(), "tuning.json")
+    candidates = [(1, 1), (2, 1)]
+    mapper = AdaptiveParallelMapper(candidates, store=path)
+    for _ in candidates:
+        mapper(abs, range(20))
+    assert_true(os.path.exists(path))
+    other = AdaptiveParallelMapper(candidates, store=path)
+    assert_equal(other.next_config(abs, 20), mapper.best_config(abs, 20))
+    measures = TuningStore(path).measures(function_key(abs), 20)
+    assert_equal(sorted(measures), candidates)
+
+def test_min_items():
+    mapper = AdaptiveParallelMapper([(1, 1)], store=None, min_items=10)
+    mapper(abs, range(5))
+    assert_equal(mapper.best_config(abs, 5), None)
+
+def test_size_buckets():
+    candidates = [(1, 1), (2, 1)]
+    mapper = AdaptiveParallelMapper(candidates, store=None)
+    for _ in candidates:
+        mapper(abs, range(10))
+    assert_true(mapper.best_config(abs, 10) is not None)
+    # Another size explores again
+    assert_equal(mapper.best_config(abs, 1000), None)
+    assert_equal(mapper.next_config(abs, 1000), candidates[0])
+
+def test_exploration_every():
+    candidates = [(1, 1), (2, 1)]
+    store = TuningStore()
+    key = function_key(abs)
+    store.record(key, (1, 1), 10, 1.)
+    store.record(key, (2, 1), 10, 1000.)
+    mapper = AdaptiveParallelMapper(candidates, store=store, explore_every=3)
+    # Two measures so far: the best is used
+    assert_equal(mapper.next_config(abs, 10), (2, 1))
+    store.record(key, (2, 1), 10, 1000.)
+    # Three measures: the candidate measured the longest ago is run again
+    assert_equal(mapper.next_config(abs, 10), (1, 1))
+
+def test_exploration_beyond_history():
+    candidates = [(1, 1), (2, 1)]
+    store = TuningStore()
+    key = function_key(abs)
+    mapper = AdaptiveParallelMapper(candidates, store=store, explore_every=10)
+    used = []
+    for _ in range(300):
+        config = mapper.next_config(abs, 10)
+        used.append(config)
+        store.record(key, config, 10, 1. if config == (1, 1) else 1000.)
+    # The losing candidate keeps being explored once every 10 calls
+    explored = [i for i, config in enumerate(used) if config == (1, 1)]
+    assert_equal(len(explored), 30)
+    assert_true(explored[-1] >= 290)
+    assert_equal(store.n_records(key, 10), 300)
+    assert_equal(len(store.measures(key, 10)[(2, 1)]), 20)
+
+def test_concurrent_stores():
+    path = os.path.join(tempfile.mkdtemp(), "tuning.json")
+    first, second = TuningStore(path), TuningStore(path)
+    first.record("f", (1, 1), 10, 1.)
+    second.record("f", (2, 1), 10, 2.)
+    first.record("g", (1, 1), 10, 3.)
+    measures = TuningStore(path).measures("f", 10)
+    assert_equal(measures, {(1, 1): [1.], (2, 1): [2.]})
+    assert_equal(size_bucket(10), size_bucket(15))
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Self-tuning of the number of workers and of the chunk size from the measured
+throughput
+"""
+
+__author__ = "Begon Jean-Michel <jm.begon@gmail.com>"
+__copyright__ = "3-clause BSD License"
+__date__ = "19 Oct. 2026"
+
+
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+from functools import partial
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows
+    fcntl = None
+
+from .taskcarrier import Mapper, StaticParallelMapper, cpu_count
+from .sources import FileSource
+
+
+DEFAULT_STORE = os.path.join(os.path.expanduser("~"), ".taskcarrier",
+                             "tuning.json")
+
+# The number of most recent measures kept per configuration and size
+HISTORY = 20
+
+
+def function_key(function):
+    """
+    Return a key identifying `function` across runs
+
+    Example
+    -------
+    >>> function_key(os.path.join)
+    'posixpath.join'
+    """
+    if isinstance(function, partial):
+        return function_key(function.func)
+    name = getattr(function, "__name__", type(function).__name__)
+    owner = getattr(function, "im_class", None)
+    if owner is not None:
+        name = owner.__name__ + "." + name
+    module = getattr(function, "__module__", None)
+    if module is None:
+        return name
+    return module + "." + name
+
+
+def default_candidates(max_jobs=None, chunks_per_worker=(1, 4)):
+    """
+    Return the default candidate configurations: the powers of 2 up to
+    `max_jobs` (Default : the number of CPUs) and `max_jobs` itself for the
+    number of workers, combined with the given numbers of chunks per worker
+
+    Example
+    -------
+    >>> default_candidates(6, (1,))
+    [(1, 1), (2, 1), (4, 1), (6, 1)]
+    """
+    if max_jobs is None:
+        max_jobs = cpu_count()
+    n_jobs = []
+    n = 1
+    while n < max_jobs:
+        n_jobs.append(n)
+        n *= 2
+    n_jobs.append(max_jobs)
+    return [(n, c) for n in n_jobs for c in chunks_per_worker]
+
+
+def size_bucket(n_items):
+    """
+    Return the bucket of the input size `n_items`: the measures of a
+    configuration are only compared between runs of the same bucket, the
+    startup overhead weighing more on the small runs
+
+    Example
+    -------
+    >>> [size_bucket(n) for n in (1, 2, 3, 4, 1000)]
+    [0, 1, 1, 2, 9]
+    """
+    return max(int(n_items), 1).bit_length() - 1
+
+
+class TuningStore(object):
+    """
+    ===========
+    TuningStore
+    ===========
+    A :class:`TuningStore` keeps the throughputs (items/sec) measured for
+    each configuration of each function and each input size bucket (see
+    :func:`size_bucket`) in a JSON file. Only the last HISTORY measures of
+    each are kept, but the store counts all the records of each function and
+    bucket and remembers when each configuration was last measured.
+
+    The file is read again before each access and each record is merged in
+    the file under a lock, so that concurrent processes sharing the file do
+    not overwrite each other's measures.
+
+    Constructor parameters
+    ----------------------
+    path : str or None (Default : None)
+        The path of the JSON file (created if needed). If None, the
+        measures are only kept in memory
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._measures = {}
+        self._load()
+
+    def _load(self):
+        """Read the measures back from the file, if any"""
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path) as hdl:
+                self._measures = json.load(hdl)
+
+    def _bucket(self, key, n_items):
+        """Return the (possibly new) record of the size bucket"""
+        return self._measures.setdefault(key, {}).setdefault(
+            str(size_bucket(n_items)),
+            {"n_records": 0, "throughputs": {}, "last": {}})
+
+    def _read(self, key, n_items):
+        """Return the record of the size bucket (an empty one if none)"""
+        self._load()
+        return self._measures.get(key, {}).get(
+            str(size_bucket(n_items)),
+            {"n_records": 0, "throughputs": {}, "last": {}})
+
+    @staticmethod
+    def _by_config(mapping):
+        return dict((tuple(int(x) for x in config.split("x")), value)
+                    for config, value in mapping.items())
+
+    def measures(self, key, n_items):
+        """
+        Return a dict mapping each measured configuration (n_jobs,
+        chunks_per_worker) of the function `key` to its list of throughputs
+        on inputs of the size bucket of `n_items`
+        """
+        return self._by_config(self._read(key, n_items)["throughputs"])
+
+    def n_records(self, key, n_items):
+        """
+        Return the number of measures ever recorded for the function `key`
+        on inputs of the size bucket of `n_items`
+        """
+        return self._read(key, n_items)["n_records"]
+
+    def last_records(self, key, n_items):
+        """
+        Return a dict mapping each measured configuration to the number of
+        records of its size bucket when it was last measured
+        """
+        return self._by_config(self._read(key, n_items)["last"])
+
+    def record(self, key, config, n_items, throughput):
+        """Record a measure and persist the store"""
+        config = "%dx%d" % config
+        with self._locked():
+            self._load()
+            bucket = self._bucket(key, n_items)
+            throughputs = bucket["throughputs"].setdefault(config, [])
+            throughputs.append(throughput)
+            del throughputs[:-HISTORY]
+            bucket["n_records"] += 1
+            bucket["last"][config] = bucket["n_records"]
+            self.save()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the lock of the file, if any"""
+        if self.path is None or fcntl is None:
+            yield
+            return
+        folder = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.path + ".lock", "a") as hdl:
+            fcntl.flock(hdl, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(hdl, fcntl.LOCK_UN)
+
+    def save(self):
+        if self.path is None:
+            return
+        folder = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        # Write-and-rename so that a concurrent reader never sees a
+        # partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=folder)
+        with os.fdopen(fd, "w") as hdl:
+            json.dump(self._measures, hdl, indent=1, sort_keys=True)
+        os.rename(tmp_path, self.path)
+
+
+class AdaptiveParallelMapper(Mapper):
+    """
+    ======================
+    AdaptiveParallelMapper
+    ======================
+    An :class:`AdaptiveParallelMapper` tunes the number of workers and the
+    chunk size of a :class:`StaticParallelMapper` from the throughput
+    (items/sec) measured across repeated calls with the same function.
+
+    The measures are kept per input size bucket (see :func:`size_bucket`),
+    so that a configuration is only compared to the others on inputs of a
+    similar size. Each call with a given function runs the first candidate
+    configuration which has not been measured yet for that function and
+    that size. Once they all have, the configuration with the best mean
+    throughput is used, except that every `explore_every` calls the
+    candidate measured the longest ago is run again, so that a configuration unlucky on its
+    first measure (or a change of the machine load) is caught up with. The
+    measures are persisted per function so that later runs (even in other
+    processes) start with the tuned configuration.
+
+    Memory-bandwidth-bound or I/O-mixed functions often run faster with fewer
+    workers than there are cores.
+
+    Constructor parameters
+    ----------------------
+    candidates : list of pairs (n_jobs, chunks_per_worker) or None
+    (Default : None)
+        The configurations to explore. If None, :func:`default_candidates`
+    store : str, :class:`TuningStore` or None (Default : DEFAULT_STORE)
+        Where to persist the measures (a path or a store). If None, the
+        measures are only kept in memory
+    min_items : int (>=0) (Default : 0)
+        Runs on fewer items are not measured (their throughput would mostly
+        reflect the start-up overhead)
+    explore_every : int (>0) or None (Default : 10)
+        Once all the candidates are measured, one call out of
+        `explore_every` runs the candidate measured the longest ago. If None, the
+        best configuration is always used
+    kwargs :
+        The other parameters of the :class:`StaticParallelMapper`
+
+    Attributes
+    ----------
+    stats : :class:`RunStats`
+        The statistics of the last run. Its `config` attribute holds the
+        configuration used
+    """
+
+    def __init__(self, candidates=None, store=DEFAULT_STORE, min_items=0,
+                 explore_every=10, **kwargs):
+        if candidates is None:
+            candidates = default_candidates()
+        self.candidates = [tuple(c) for c in candidates]
+        if not isinstance(store, TuningStore):
+            store = TuningStore(store)
+        self.store = store
+        self.min_items = min_items
+        self.explore_every = explore_every
+        self.mapper_kwargs = kwargs
+        self.stats = None
+
+    def best_config(self, function, n_items):
+        """
+        Return the configuration with the best mean throughput for
+        `function` on `n_items` items, or None if some candidate has not
+        been measured yet
+        """
+        measures = self.store.measures(function_key(function), n_items)
+        if any(config not in measures for config in self.candidates):
+            return None
+        mean = lambda config: (sum(measures[config]) /
+                               float(len(measures[config])))
+        return max(self.candidates, key=mean)
+
+    def next_config(self, function, n_items):
+        """Return the configuration to use for the next call"""
+        measures = self.store.measures(function_key(function), n_items)
+        for config in self.candidates:
+            if config not in measures:
+                return config
+        key = function_key(function)
+        if (self.explore_every is not None and
+                self.store.n_records(key, n_items) % self.explore_every == 0):
+            last = self.store.last_records(key, n_items)
+            return min(self.candidates, key=lambda config: last[config])
+        return self.best_config(function, n_items)
+
+    def map(self, function, seq1, *seqs):
+        if isinstance(seq1, FileSource):
+            raise ValueError("The adaptive mapper cannot map a file source: "
+                             "its size is unknown beforehand")
+        config = self.next_config(function, len(seq1))
+        n_jobs, chunks_per_worker = config
+        mapper = StaticParallelMapper(n_jobs,
+                                      chunks_per_worker=chunks_per_worker,
+                                      **self.mapper_kwargs)
+        results = mapper.map(function, seq1, *seqs)
+        self.stats = mapper.stats
+        self.stats.config = config
+        if len(seq1) > 0 and len(seq1) >= self.min_items:
+            self.store.record(function_key(function), config, len(seq1),
+                              self.stats.throughput)
+        return results